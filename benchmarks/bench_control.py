@@ -0,0 +1,73 @@
+"""End-to-end delay from a probe temperature step to the output toggling.
+
+Runs the sense and control tasks of the real Runtime on the simulated
+clock, steps the freezer temperature across the switching threshold and
+records when the Peltier output changes. Delays are simulated time.
+"""
+import random
+import threading
+
+from common import TIMING_TOLERANCE, percentile, setup
+
+def run(results, steps=10, seed=1, speed=10.0):
+    """Measure sensor-to-output delay for upward and downward steps"""
+    board = setup()
+    clock = board.clock
+    host_speed = clock.speed
+    clock.set_speed(speed)
+    model = board.model
+    from control.controllers import create_controller
+    from monitor.temperature_monitor import TemperatureMonitor
+    from runtime.runtime import Runtime
+    from tools.ds import DS
+
+    # No minimum on/off times so the delay is the pipeline's alone
+    controller = create_controller({"type": "bang_bang", "hysteresis": 0.5,
+                                    "min_on_s": 0, "min_off_s": 0})
+    monitor = TemperatureMonitor(DS(data_pin=2), controller=controller)
+    monitor.set_target_temp(0.0)
+
+    toggled = threading.Event()
+    set_output = board.set_output
+    def watch_output(level):
+        if (level > 0) != (model.output > 0):
+            toggled.set()
+        set_output(level)
+    board.set_output = watch_output
+
+    def hold(temp):
+        """Pin the air and probe temperature (no thermal dynamics)"""
+        model.temp = temp
+        model.probe_temp = temp
+        model.pull_rate = 0.0
+        model.tau = 1e12
+
+    hold(-2.0)
+    runtime = Runtime(monitor)
+    thread = threading.Thread(target=runtime.run, daemon=True)
+    thread.start()
+
+    rng = random.Random(seed)
+    delays = []
+    try:
+        # Settle with the output off
+        clock.sleep(3)
+        for i in range(steps):
+            # Step at a random phase of the sample/control periods
+            clock.sleep(rng.uniform(0, 1))
+            toggled.clear()
+            start = clock.now()
+            hold(2.0 if i % 2 == 0 else -2.0)
+            if not toggled.wait(timeout=30):
+                raise RuntimeError("Output did not toggle")
+            delays.append((clock.now() - start) * 1000)
+    finally:
+        runtime.stop()
+        thread.join(timeout=5)
+        board.set_output = set_output
+        clock.set_speed(host_speed)
+
+    results.add("control.sensor_to_output.mean_ms", sum(delays) / len(delays), "ms",
+                tolerance=TIMING_TOLERANCE)
+    results.add("control.sensor_to_output.max_ms", percentile(delays, 1.0), "ms",
+                tolerance=TIMING_TOLERANCE)
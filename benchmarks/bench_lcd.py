@@ -0,0 +1,70 @@
+"""I2C traffic per LCD screen draw, measured on the simulated HD44780."""
+from common import setup
+
+class _Traffic:
+    """Counts transactions and bytes sent to the LCD since the last take()"""
+
+    def __init__(self, device):
+        self.device = device
+        self.transactions = device.transactions
+        self.bytes_written = device.bytes_written
+
+    def take(self):
+        """Get (transactions, bytes) since the previous call"""
+        device = self.device
+        counts = (device.transactions - self.transactions,
+                  device.bytes_written - self.bytes_written)
+        self.transactions = device.transactions
+        self.bytes_written = device.bytes_written
+        return counts
+
+def _measure(results, name, traffic, draw, calls):
+    """Record the per-call traffic of a draw function"""
+    traffic.take()
+    for _ in range(calls):
+        draw()
+    transactions, sent = traffic.take()
+    results.add(f"lcd.{name}.i2c_transactions", transactions / calls, "txn/call")
+    results.add(f"lcd.{name}.i2c_bytes", sent / calls, "bytes/call")
+
+def run(results, calls=50):
+    """Measure full, unchanged and changed redraws of two screens"""
+    board = setup()
+    from gui.buttons import PRESS, DOWN
+    from gui.gui import GUI
+    from monitor.temperature_monitor import TemperatureMonitor
+    from tools.ds import DS
+    from tools.lcd import LCD
+
+    lcd = LCD(i2c_id=0, i2c_addr=39, sda_pin=0, scl_pin=1, num_rows=2, num_cols=16)
+    traffic = _Traffic(board.lcd)
+
+    def full_temperature():
+        lcd.redraw()
+        lcd.display_temperature_screen(-18.5)
+
+    temps = [-18.5, -18.4375]
+    def changed_temperature():
+        temps.reverse()
+        lcd.display_temperature_screen(temps[0])
+
+    _measure(results, "temperature_screen.full", traffic, full_temperature, calls)
+    _measure(results, "temperature_screen.unchanged", traffic,
+             lambda: lcd.display_temperature_screen(-18.5), calls)
+    _measure(results, "temperature_screen.changed", traffic, changed_temperature, calls)
+
+    monitor = TemperatureMonitor(DS(data_pin=2))
+    gui = GUI(lcd=lcd, temp_monitor=monitor, wifi_manager=None)
+
+    def full_menu():
+        lcd.redraw()
+        gui.menu.invalidate()
+        gui.render()
+
+    def moved_menu():
+        gui.handle(PRESS | DOWN)
+        gui.render()
+
+    _measure(results, "refresh_menu.full", traffic, full_menu, calls)
+    _measure(results, "refresh_menu.unchanged", traffic, gui.render, calls)
+    _measure(results, "refresh_menu.moved", traffic, moved_menu, calls)
@@ -0,0 +1,59 @@
+"""Memory allocated and GC runs per monitor loop iteration.
+
+Measured on the host interpreter: bytes are the peak traced by tracemalloc
+within an iteration and GC runs are CPython generation-0 collections, so
+the numbers track allocation churn rather than MicroPython heap usage.
+"""
+import gc
+import tracemalloc
+
+from common import setup
+
+# Simulated time between iterations
+STEP_S = 0.05
+
+def run(results, iterations=2000):
+    """Run sample() + update_output() with the clock stepped between iterations"""
+    board = setup()
+    from control.controllers import create_controller
+    from monitor.temperature_monitor import TemperatureMonitor
+    from storage.data_logger import DataLogger
+    from tools.ds import DS
+    import os
+    import tempfile
+
+    log_dir = os.path.join(tempfile.mkdtemp(prefix='bench-log-'), 'log')
+    ds = DS(data_pin=2)
+    monitor = TemperatureMonitor(ds, data_logger=DataLogger(len(ds.roms), log_dir),
+                                 controller=create_controller({"type": "pid"}))
+    monitor.set_target_temp(-18)
+
+    def iteration():
+        monitor.sample()
+        monitor.update_output()
+        board.clock.advance(STEP_S)
+
+    # Warm up caches, history tiers and the logger's page buffer
+    for _ in range(200):
+        iteration()
+
+    collections = [0]
+    def count(phase, info):
+        if phase == "start":
+            collections[0] += 1
+    gc.callbacks.append(count)
+
+    tracemalloc.start()
+    peak_total = 0
+    try:
+        for _ in range(iterations):
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            iteration()
+            peak_total += tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+        gc.callbacks.remove(count)
+
+    results.add("monitor.loop.bytes_allocated", peak_total / iterations, "bytes/iter")
+    results.add("monitor.loop.gc_runs", collections[0] / iterations, "runs/iter")
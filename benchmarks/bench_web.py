@@ -0,0 +1,88 @@
+"""WebServer throughput and latency over loopback keep-alive connections."""
+import asyncio
+import time
+
+from common import TIMING_TOLERANCE, percentile, setup
+
+# (metric name, raw request)
+REQUESTS = [
+    ("index", b"GET / HTTP/1.1\r\nHost: bench\r\n\r\n"),
+    ("index_gzip", b"GET / HTTP/1.1\r\nHost: bench\r\nAccept-Encoding: gzip, deflate\r\n\r\n"),
+    ("style_css", b"GET /style.css HTTP/1.1\r\nHost: bench\r\n\r\n"),
+    ("api_data", b"GET /api/data HTTP/1.1\r\nHost: bench\r\n\r\n"),
+    ("api_target", b"POST /api/target HTTP/1.1\r\nHost: bench\r\n"
+                   b"Content-Type: application/x-www-form-urlencoded\r\n"
+                   b"Content-Length: 10\r\n\r\ntarget=4.5"),
+]
+
+async def _read_response(reader):
+    """Read one Content-Length framed response
+    Returns:
+        tuple: (status code, body length)
+    """
+    status = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        if line[:15].lower() == b"content-length:":
+            length = int(line[15:])
+    if length:
+        await reader.readexactly(length)
+    return int(status.split()[1]), length
+
+async def _client(port, request, count, latencies, sizes):
+    """Send count requests on one keep-alive connection"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status, length = await _read_response(reader)
+            latencies.append((time.perf_counter() - start) * 1000)
+            sizes.append(length)
+            if status != 200:
+                raise RuntimeError(f"Unexpected status {status}")
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+async def _bench(results, monitor, requests_per_path, connections):
+    """Serve on an ephemeral port and run the clients for every path"""
+    from web.server import WebServer
+    server = WebServer(None, monitor)
+    server.start()
+    while server.server is None:
+        await asyncio.sleep(0.001)
+    port = server.server.sockets[0].getsockname()[1]
+
+    try:
+        for name, request in REQUESTS:
+            latencies = []
+            sizes = []
+            per_client = requests_per_path // connections
+            start = time.perf_counter()
+            await asyncio.gather(*[_client(port, request, per_client, latencies, sizes)
+                                   for _ in range(connections)])
+            elapsed = time.perf_counter() - start
+            results.add(f"web.{name}.requests_per_s", len(latencies) / elapsed, "req/s", True,
+                        tolerance=TIMING_TOLERANCE)
+            results.add(f"web.{name}.p50_ms", percentile(latencies, 0.5), "ms",
+                        tolerance=TIMING_TOLERANCE)
+            results.add(f"web.{name}.p99_ms", percentile(latencies, 0.99), "ms",
+                        tolerance=TIMING_TOLERANCE)
+            results.add(f"web.{name}.response_bytes", max(sizes), "bytes")
+    finally:
+        server.stop()
+        # Let the connection handlers see the closed sockets and exit
+        await asyncio.sleep(0.1)
+
+def run(results, requests_per_path=2000, connections=4):
+    """Measure requests/s and p50/p99 latency for each path"""
+    setup()
+    from monitor.temperature_monitor import TemperatureMonitor
+    from tools.ds import DS
+    monitor = TemperatureMonitor(DS(data_pin=2))
+    asyncio.run(_bench(results, monitor, requests_per_path, connections))
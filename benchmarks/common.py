@@ -0,0 +1,60 @@
+"""Shared setup for the host benchmarks."""
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(REPO_DIR, 'src')
+
+_board = None
+
+def setup(speed=1.0):
+    """Install the simulated board once (every benchmark shares it)
+
+    Args:
+        speed (float): Simulated seconds per real second
+    Returns:
+        Board: The simulated board
+    """
+    global _board
+    if _board is None:
+        if SRC_DIR not in sys.path:
+            sys.path.insert(0, SRC_DIR)
+        from sim.board import Board
+        from sim.boot import install
+        from sim.clock import SimClock
+        _board = install(Board(clock=SimClock(speed=speed)), port=0)
+    return _board
+
+def percentile(samples, fraction):
+    """Get a percentile (fraction 0..1) of a list by nearest rank"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+# Allowed relative worsening of wall-clock timings, which vary between runs
+TIMING_TOLERANCE = 0.5
+
+class Results:
+    """Named benchmark metrics with a unit and whether higher is better."""
+
+    def __init__(self):
+        """Initialize an empty result set"""
+        self.metrics = {}
+
+    def add(self, name, value, unit, higher_is_better=False, tolerance=None):
+        """Record a metric
+
+        Args:
+            tolerance (float): Allowed relative worsening for noisy timings
+                (default: the run's --tolerance)
+        """
+        self.metrics[name] = {
+            "value": round(value, 3) if isinstance(value, float) else value,
+            "unit": unit,
+            "better": "higher" if higher_is_better else "lower",
+        }
+        if tolerance is not None:
+            self.metrics[name]["tolerance"] = tolerance
+        print(f"  {name:48} {self.metrics[name]['value']:>12} {unit}")
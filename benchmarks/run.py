@@ -0,0 +1,110 @@
+"""Run the host benchmarks, write the results as JSON and compare them to a baseline.
+
+    python3 benchmarks/run.py                      # run all, compare to baseline.json
+    python3 benchmarks/run.py web lcd              # run a subset
+    python3 benchmarks/run.py --save-baseline      # accept the results as the new baseline
+
+Exits with status 1 when a metric is worse than the baseline by more than
+the tolerance (wall-clock timings use the wider TIMING_TOLERANCE).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import bench_control
+import bench_lcd
+import bench_monitor
+import bench_web
+from common import Results, setup
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SUITES = {
+    "web": bench_web.run,
+    "lcd": bench_lcd.run,
+    "monitor": bench_monitor.run,
+    "control": bench_control.run,
+}
+
+def compare(current, baseline, tolerance):
+    """Print current vs baseline for every metric
+
+    Returns:
+        list: Names of the metrics that regressed by more than tolerance
+    """
+    regressions = []
+    print(f"\n{'metric':48} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, metric in current.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:48} {'-':>12} {metric['value']:>12} {'new':>8}")
+            continue
+        old = base["value"]
+        new = metric["value"]
+        if old == 0:
+            change = 0.0 if new == 0 else float('inf')
+        else:
+            change = (new - old) / abs(old)
+        worse = -change if metric["better"] == "higher" else change
+        flag = ""
+        if worse > metric.get("tolerance", tolerance):
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:48} {old:>12} {new:>12} {change:>+8.1%}{flag}")
+    return regressions
+
+def main():
+    """Parse the command line and run the selected suites"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('suites', nargs='*', choices=[[]] + list(SUITES),
+                        help='suites to run (default: all)')
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results.json'),
+                        help='where to write the results')
+    parser.add_argument('--baseline', default=os.path.join(BENCH_DIR, 'baseline.json'),
+                        help='baseline to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='allowed relative worsening before a metric counts as a regression')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='write the results to the baseline file as well')
+    args = parser.parse_args()
+
+    setup()
+    results = Results()
+    for name in args.suites or SUITES:
+        print(f"{name}:")
+        SUITES[name](results)
+
+    report = {
+        "meta": {
+            "time": int(time.time()),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "metrics": results.metrics,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline)")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)["metrics"]
+    regressions = compare(results.metrics, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
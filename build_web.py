@@ -0,0 +1,71 @@
+"""Precompress the web assets in src/web for gzip serving.
+
+Writes a '.gz' sibling next to each text asset (html, css, js, json,
+svg) when compression makes it smaller, and removes stale ones. The web
+server serves the '.gz' file with Content-Encoding: gzip to clients that
+accept it. Run this before uploading src/ whenever a web file changes.
+
+    python3 build_web.py [--check]
+"""
+import argparse
+import gzip
+import os
+import sys
+
+WEB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'web')
+EXTENSIONS = ('.html', '.css', '.js', '.json', '.svg')
+
+def compress(data):
+    """Gzip data reproducibly (no timestamp or file name in the header)"""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def build(web_dir=WEB_DIR, check=False):
+    """Write (or with check, verify) the .gz siblings
+    Returns:
+        list: Paths that were (or, with check, would be) changed
+    """
+    changed = []
+    for name in sorted(os.listdir(web_dir)):
+        if not name.endswith(EXTENSIONS):
+            continue
+        path = os.path.join(web_dir, name)
+        gz_path = path + '.gz'
+        with open(path, 'rb') as f:
+            data = f.read()
+        packed = compress(data)
+
+        try:
+            with open(gz_path, 'rb') as f:
+                current = f.read()
+        except OSError:
+            current = None
+
+        if len(packed) >= len(data):
+            # Not worth it: serve the plain file
+            if current is not None:
+                changed.append(gz_path)
+                if not check:
+                    os.remove(gz_path)
+            continue
+        if packed != current:
+            changed.append(gz_path)
+            if not check:
+                with open(gz_path, 'wb') as f:
+                    f.write(packed)
+        print(f"{name}: {len(data)} -> {len(packed)} bytes")
+    return changed
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--check', action='store_true',
+                        help='only report out-of-date .gz files (exit 1 if any)')
+    args = parser.parse_args()
+    changed = build(check=args.check)
+    for path in changed:
+        print(f"{'out of date' if args.check else 'updated'}: {os.path.relpath(path)}")
+    if args.check and changed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
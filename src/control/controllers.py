@@ -0,0 +1,146 @@
+class Controller:
+    """Base class for cooling controllers.
+
+    A controller turns the measured and target temperature into an output
+    level between 0.0 (off) and 1.0 (full cooling). It is ticked every
+    period_ms with the elapsed time, independent of when readings arrive.
+    """
+
+    # Whether the output is a PWM duty cycle (otherwise on/off)
+    uses_pwm = False
+
+    def __init__(self, period_ms=500):
+        """Initialize the controller with its tick period"""
+        self.period_ms = period_ms
+        self.output = 0.0
+
+    def update(self, temp, target, dt):
+        """Compute the output for one tick (to be overridden by subclasses)
+
+        Args:
+            temp (float): Measured temperature (C)
+            target (float): Target temperature (C)
+            dt (float): Seconds since the previous tick
+        Returns:
+            float: Output level from 0.0 to 1.0
+        """
+        raise NotImplementedError("Subclasses must implement update()")
+
+    def reset(self):
+        """Forget internal state and switch the output off"""
+        self.output = 0.0
+
+class BangBangController(Controller):
+    """On/off cooling with a hysteresis band and minimum on/off times."""
+
+    def __init__(self, hysteresis=0.5, min_on_s=30, min_off_s=30, period_ms=500):
+        """Initialize the controller
+
+        Args:
+            hysteresis (float): Width of the dead band around the target (C)
+            min_on_s (float): Shortest time the output stays on
+            min_off_s (float): Shortest time the output stays off
+        """
+        super().__init__(period_ms)
+        self.hysteresis = hysteresis
+        self.min_on_s = min_on_s
+        self.min_off_s = min_off_s
+        # Start as if the output had been off long enough to switch on
+        self.time_in_state = min_off_s
+
+    def update(self, temp, target, dt):
+        """Switch on above target + h/2 and off below target - h/2"""
+        self.time_in_state += dt
+        half_band = self.hysteresis / 2
+
+        if self.output:
+            if temp < target - half_band and self.time_in_state >= self.min_on_s:
+                self.output = 0.0
+                self.time_in_state = 0
+        else:
+            if temp > target + half_band and self.time_in_state >= self.min_off_s:
+                self.output = 1.0
+                self.time_in_state = 0
+        return self.output
+
+    def reset(self):
+        """Switch off and allow switching on immediately"""
+        super().reset()
+        self.time_in_state = self.min_off_s
+
+class PIDController(Controller):
+    """PID cooling on a PWM duty cycle with integrator anti-windup.
+
+    The error is temp - target, so a positive output means more cooling.
+    The derivative acts on the measurement to avoid a kick on target
+    changes, and the integrator stops while the output is saturated in the
+    direction the error pushes it.
+    """
+
+    uses_pwm = True
+
+    def __init__(self, kp=0.5, ki=0.005, kd=0.0, pwm_freq=1000, period_ms=1000):
+        """Initialize the controller
+
+        Args:
+            kp (float): Proportional gain (per C)
+            ki (float): Integral gain (per C second)
+            kd (float): Derivative gain (seconds per C)
+            pwm_freq (int): PWM frequency for the output pin (Hz)
+        """
+        super().__init__(period_ms)
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.pwm_freq = pwm_freq
+        self.integral = 0.0
+        self.last_temp = None
+
+    def update(self, temp, target, dt):
+        """Compute the PWM duty for one tick"""
+        error = temp - target
+
+        derivative = 0.0
+        if self.last_temp is not None and dt > 0:
+            derivative = (temp - self.last_temp) / dt
+        self.last_temp = temp
+
+        integral = self.integral + error * dt
+        output = self.kp * error + self.ki * integral + self.kd * derivative
+
+        # Anti-windup: only integrate while not pushing further into saturation
+        if output > 1.0:
+            output = 1.0
+            if error < 0:
+                self.integral = integral
+        elif output < 0.0:
+            output = 0.0
+            if error > 0:
+                self.integral = integral
+        else:
+            self.integral = integral
+
+        self.output = output
+        return output
+
+    def reset(self):
+        """Clear the integrator and derivative history"""
+        super().reset()
+        self.integral = 0.0
+        self.last_temp = None
+
+def create_controller(config):
+    """Build a controller from a config dict
+
+    Args:
+        config (dict): {"type": "bang_bang" | "pid", ...constructor arguments}
+    Returns:
+        Controller: The configured controller
+    """
+    options = dict(config)
+    kind = options.pop("type", "bang_bang")
+    if kind == "bang_bang":
+        return BangBangController(**options)
+    if kind == "pid":
+        return PIDController(**options)
+    raise ValueError(f"Unknown controller type: {kind}")
@@ -0,0 +1,88 @@
+"""Host-side harness that scores cooling controllers on a simulated freezer.
+
+Run from src/:  python -m control.harness
+"""
+from control.controllers import create_controller
+from sim.thermal import FreezerModel
+
+# Controllers compared by default
+CONFIGS = [
+    {"type": "bang_bang", "hysteresis": 0.0, "min_on_s": 0, "min_off_s": 0},
+    {"type": "bang_bang", "hysteresis": 0.5, "min_on_s": 30, "min_off_s": 30},
+    {"type": "pid", "kp": 0.5, "ki": 0.005, "kd": 0.0},
+]
+
+def score(config, target=4.0, duration_s=4 * 3600, band=0.5, plant=None, dt=1.0):
+    """Simulate one controller and score it
+
+    Args:
+        config (dict): Controller config (see create_controller)
+        target (float): Target temperature (C)
+        duration_s (int): Simulated time (s)
+        band (float): Settling band around the target (C)
+        plant (FreezerModel): Thermal model (default: FreezerModel())
+    Returns:
+        dict: overshoot (C), settling_s, energy_wh, switches, rms_error (C)
+    """
+    controller = create_controller(config)
+    if plant is None:
+        plant = FreezerModel()
+
+    period_s = controller.period_ms / 1000
+    next_tick = 0.0
+    output = 0.0
+    reached = False
+    overshoot = 0.0
+    settled_at = None
+    energy_j = 0.0
+    switches = 0
+    error_sq = 0.0
+    steps = 0
+
+    t = 0.0
+    while t < duration_s:
+        if t >= next_tick:
+            new_output = controller.update(plant.read_probe(), target, period_s)
+            if (new_output > 0) != (output > 0):
+                switches += 1
+            output = new_output
+            next_tick += period_s
+
+        plant.step(output, dt)
+        energy_j += plant.power_w * output * dt
+        t += dt
+
+        error = plant.temp - target
+        if not reached and error <= 0:
+            reached = True
+        if reached:
+            overshoot = max(overshoot, -error)
+            error_sq += error * error
+            steps += 1
+        if abs(error) > band:
+            settled_at = None
+        elif settled_at is None:
+            settled_at = t
+
+    return {
+        "overshoot": overshoot,
+        "settling_s": settled_at,
+        "energy_wh": energy_j / 3600,
+        "switches": switches,
+        "rms_error": (error_sq / steps) ** 0.5 if steps else None,
+    }
+
+def main():
+    """Score every configured controller and print a table"""
+    print(f"{'controller':48} {'overshoot':>9} {'settle s':>9} {'energy Wh':>9} {'switches':>8} {'rms':>6}")
+    for config in CONFIGS:
+        result = score(config)
+        settling = result["settling_s"]
+        rms = result["rms_error"]
+        print(f"{str(config)[:48]:48} {result['overshoot']:9.2f} "
+              f"{settling if settling is not None else '-':>9} "
+              f"{result['energy_wh']:9.1f} {result['switches']:8d} "
+              f"{rms if rms is not None else 0:6.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+from array import array
+from machine import Pin
+import utime
+
+# Button masks
+UP = 0x01
+DOWN = 0x02
+SELECT = 0x04
+LEFT = 0x08
+RIGHT = 0x10
+
+# Event kinds; an event is kind | button mask (e.g. PRESS | UP, CHORD | UP | DOWN)
+PRESS = 0x100
+RELEASE = 0x200
+LONG = 0x300
+REPEAT = 0x400
+CHORD = 0x500
+KIND_MASK = 0xff00
+BUTTON_MASK = 0x00ff
+
+class Buttons:
+    """Interrupt-driven button input turned into a queue of events.
+
+    Pin interrupts timestamp every edge into a fixed-size ring (the IRQ
+    only writes the head, the consumer only the tail, so no lock is
+    needed). next_event() debounces the edges by time and derives press,
+    release, long-press, auto-repeat and chord events from them. Presses
+    of a chord button are held back for CHORD_MS so that pressing both
+    buttons of a chord reports only the chord.
+    """
+
+    # Edges closer than this to the previous accepted edge are bounce
+    DEBOUNCE_MS = 30
+    # How long a press waits for the other button of its chord
+    CHORD_MS = 80
+    LONG_PRESS_MS = 800
+    # Auto-repeat of held buttons: first repeat, then every REPEAT_MS
+    REPEAT_DELAY_MS = 500
+    REPEAT_MS = 150
+    # Edge and event ring size (power of two)
+    RING_SIZE = 32
+
+    CHORDS = (UP | DOWN, LEFT | RIGHT)
+    # Buttons that auto-repeat while held
+    REPEATING = UP | DOWN | LEFT | RIGHT
+
+    def __init__(self, up_pin=13, down_pin=15, select_pin=14, left_pin=11, right_pin=12):
+        """Initialize the buttons (active low with pull-ups) and their interrupts"""
+        self.pins = []
+        for pin in (up_pin, down_pin, select_pin, left_pin, right_pin):
+            self.pins.append(pin if isinstance(pin, Pin) else Pin(pin, Pin.IN, Pin.PULL_UP))
+        count = len(self.pins)
+
+        # Raw edges, written by the interrupt handlers
+        size = self.RING_SIZE
+        self._edge_buttons = bytearray(size)
+        self._edge_levels = bytearray(size)
+        self._edge_times = array('l', [0] * size)
+        self._edge_head = 0
+        self._edge_tail = 0
+        self._last_edge = array('l', [0] * count)
+        self.dropped = 0
+
+        # Decoded events waiting for next_event()
+        self._events = array('H', [0] * size)
+        self._event_head = 0
+        self._event_tail = 0
+
+        # Debounced state (bit masks) and per-button timers
+        self.held = 0
+        self._pending = 0
+        self._chorded = 0
+        self._long_sent = 0
+        self._pressed_at = array('l', [0] * count)
+        self._next_repeat = array('l', [0] * count)
+
+        # Optional asyncio.ThreadSafeFlag set on every edge (see Runtime)
+        self.flag = None
+
+        for i in range(count):
+            self.pins[i].irq(handler=self._make_handler(i),
+                             trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
+
+    def _make_handler(self, index):
+        """Create the interrupt handler of one button"""
+        def handler(pin):
+            self._on_edge(index, pin.value())
+        return handler
+
+    def _on_edge(self, index, level):
+        """Record an edge (interrupt context: no allocation)"""
+        now = utime.ticks_ms()
+        if utime.ticks_diff(now, self._last_edge[index]) < self.DEBOUNCE_MS:
+            return
+        self._last_edge[index] = now
+
+        head = self._edge_head
+        following = (head + 1) & (self.RING_SIZE - 1)
+        if following == self._edge_tail:
+            self.dropped += 1
+            return
+        self._edge_buttons[head] = index
+        self._edge_levels[head] = level
+        self._edge_times[head] = now
+        self._edge_head = following
+
+        if self.flag is not None:
+            self.flag.set()
+
+    def next_event(self):
+        """Get the next button event
+        Returns:
+            int: kind | button mask, or 0 if there is none
+        """
+        if self._event_head == self._event_tail:
+            self.poll()
+        if self._event_head == self._event_tail:
+            return 0
+        event = self._events[self._event_tail]
+        self._event_tail = (self._event_tail + 1) & (self.RING_SIZE - 1)
+        return event
+
+    def poll(self):
+        """Decode the queued edges and fire due long-press/repeat/press events"""
+        wrap = self.RING_SIZE - 1
+        while self._edge_tail != self._edge_head:
+            tail = self._edge_tail
+            self._apply(self._edge_buttons[tail], self._edge_levels[tail], self._edge_times[tail])
+            self._edge_tail = (tail + 1) & wrap
+
+        now = utime.ticks_ms()
+        for i in range(len(self.pins)):
+            # An edge lost to debouncing shows up as a level that disagrees
+            pressed = self.pins[i].value() == 0
+            if (pressed != bool(self.held & (1 << i)) and
+                    utime.ticks_diff(now, self._last_edge[i]) >= self.DEBOUNCE_MS):
+                self._apply(i, 0 if pressed else 1, now)
+        self._fire_timers(now)
+
+    def ms_until_due(self):
+        """Get the milliseconds until poll() has a timed event to fire (None if idle)"""
+        active = self.held & ~self._chorded
+        if not active:
+            return None
+        now = utime.ticks_ms()
+        due = None
+        for i in range(len(self.pins)):
+            mask = 1 << i
+            if not active & mask:
+                continue
+            if self._pending & mask:
+                wait = self.CHORD_MS - utime.ticks_diff(now, self._pressed_at[i])
+            elif self.REPEATING & mask:
+                wait = utime.ticks_diff(self._next_repeat[i], now)
+            elif not self._long_sent & mask:
+                wait = self.LONG_PRESS_MS - utime.ticks_diff(now, self._pressed_at[i])
+            else:
+                continue
+            if due is None or wait < due:
+                due = wait
+        if due is None:
+            return None
+        return max(0, due)
+
+    def _apply(self, index, level, when):
+        """Update the debounced state with one edge"""
+        mask = 1 << index
+        if level == 0:
+            if self.held & mask:
+                return
+            self.held |= mask
+            self._pressed_at[index] = when
+            self._next_repeat[index] = utime.ticks_add(when, self.REPEAT_DELAY_MS)
+            self._long_sent &= ~mask
+
+            for chord in self.CHORDS:
+                if chord & mask and self.held & chord == chord:
+                    # Both buttons down: report the chord only
+                    self._pending &= ~chord
+                    self._chorded |= chord
+                    self._push(CHORD | chord)
+                    return
+            for chord in self.CHORDS:
+                if chord & mask:
+                    self._pending |= mask
+                    return
+            self._push(PRESS | mask)
+        else:
+            if not self.held & mask:
+                return
+            self.held &= ~mask
+            if self._chorded & mask:
+                self._chorded &= ~mask
+                self._pending &= ~mask
+                return
+            if self._pending & mask:
+                # Tapped faster than the chord window
+                self._pending &= ~mask
+                self._push(PRESS | mask)
+            self._push(RELEASE | mask)
+
+    def _fire_timers(self, now):
+        """Emit held-back presses, repeats and long presses that are due"""
+        active = self.held & ~self._chorded
+        for i in range(len(self.pins)):
+            mask = 1 << i
+            if not active & mask:
+                continue
+            held_ms = utime.ticks_diff(now, self._pressed_at[i])
+            if self._pending & mask:
+                if held_ms < self.CHORD_MS:
+                    continue
+                self._pending &= ~mask
+                self._push(PRESS | mask)
+            if self.REPEATING & mask and utime.ticks_diff(now, self._next_repeat[i]) >= 0:
+                self._next_repeat[i] = utime.ticks_add(self._next_repeat[i], self.REPEAT_MS)
+                self._push(REPEAT | mask)
+            if not self._long_sent & mask and held_ms >= self.LONG_PRESS_MS:
+                self._long_sent |= mask
+                self._push(LONG | mask)
+
+    def _push(self, event):
+        """Queue a decoded event (the oldest is dropped when full)"""
+        head = self._event_head
+        following = (head + 1) & (self.RING_SIZE - 1)
+        if following == self._event_tail:
+            self._event_tail = (self._event_tail + 1) & (self.RING_SIZE - 1)
+        self._events[head] = event
+        self._event_head = following
@@ -0,0 +1,81 @@
+import utime
+from gui.screen import Screen
+from gui.widgets import Label
+from gui.buttons import PRESS, REPEAT, CHORD, KIND_MASK, BUTTON_MASK, UP, DOWN
+from tools import instrumentation
+
+class DiagnosticsGUI(Screen):
+    """Compact diagnostics pages built from the instrumentation metrics"""
+    
+    # Time between refreshes of the shown page (ms)
+    REFRESH_MS = 1000
+    PAGE_COUNT = 4
+    
+    def __init__(self, lcd, buttons):
+        """Initialize the diagnostics GUI"""
+        super().__init__(lcd, buttons)
+        
+        self.page = 0
+        self.last_display_update = 0
+        
+        self.top_label = Label(0, width=lcd.num_cols)
+        self.bottom_label = Label(1, width=lcd.num_cols)
+        self.set_widgets([self.top_label, self.bottom_label])
+    
+    def enter(self):
+        """Show the first page"""
+        super().enter()
+        self.refresh()
+    
+    def handle(self, event):
+        """Up/down flip pages, up+down leaves"""
+        if event == CHORD | UP | DOWN:
+            return False
+        
+        kind = event & KIND_MASK
+        button = event & BUTTON_MASK
+        if kind == PRESS or kind == REPEAT:
+            if button == UP:
+                self.page = (self.page - 1) % self.PAGE_COUNT
+                self.refresh()
+            elif button == DOWN:
+                self.page = (self.page + 1) % self.PAGE_COUNT
+                self.refresh()
+        
+        return True
+    
+    def update(self):
+        """Refresh the shown page once a second"""
+        if utime.ticks_diff(utime.ticks_ms(), self.last_display_update) >= self.REFRESH_MS:
+            self.refresh()
+    
+    def refresh(self):
+        """Update the labels from the current page"""
+        self.last_display_update = utime.ticks_ms()
+        top, bottom = self.page_lines(self.page)
+        self.top_label.set_text(top)
+        self.bottom_label.set_text(bottom)
+    
+    def page_lines(self, page):
+        """Get the two lines of a page"""
+        get = instrumentation.get
+        if page == 0:
+            instrumentation.sample_memory()
+            free = get("gc_mem_free_bytes").value
+            low = get("gc_mem_free_min_bytes").value
+            return f"Free {free // 1024}K", f"Low  {low // 1024}K"
+        if page == 1:
+            sample = get("monitor_sample_us")
+            lock = get("monitor_lock_held_us")
+            return (f"Smp p99 {instrumentation.format_us(sample.quantile(0.99))}",
+                    f"Lock max {instrumentation.format_us(lock.max)}")
+        if page == 2:
+            reads = get("sensor_readings_total").value
+            errors = (get("sensor_read_errors_total").value +
+                      get("sensor_conversion_errors_total").value)
+            return f"Reads {reads}", f"Sensor err {errors}"
+        requests = get("http_requests_total")
+        errors = get("http_error_responses_total")
+        wifi_failures = get("wifi_connect_failures_total")
+        return (f"HTTP {requests.value if requests else 0} e{errors.value if errors else 0}",
+                f"WiFi fail {wifi_failures.value if wifi_failures else 0}")
@@ -0,0 +1,153 @@
+from gui.base_gui import BaseGUI
+from gui.widgets import Label, ListView
+
+class Screen(BaseGUI):
+    """Screen built from widgets and redrawn in retained mode.
+
+    Subclasses declare their content with set_widgets(); render() polls
+    the widgets' bound values and draws only the widgets that changed,
+    then flushes the LCD framebuffer. Button events go to the focused
+    widget unless the subclass handles them first.
+    """
+
+    def __init__(self, lcd, buttons):
+        """Initialize an empty screen"""
+        super().__init__(lcd, buttons)
+
+        self.widgets = []
+        self.focus = None
+        # ScreenStack the screen was pushed on
+        self.app = None
+        self._clear = True
+
+    def set_widgets(self, widgets, focus=None):
+        """Replace the screen content (the next render clears the display)
+
+        Args:
+            widgets (list): Widgets to show; later widgets draw over earlier ones
+            focus (Widget): Widget receiving the button events
+        """
+        self.widgets = widgets
+        self.focus = focus
+        self._clear = True
+
+    def invalidate(self):
+        """Redraw every widget on the next render"""
+        self._clear = True
+
+    def enter(self):
+        """Called when the screen is shown"""
+        self.invalidate()
+
+    def handle(self, event):
+        """Pass the event to the focused widget"""
+        if self.focus is not None:
+            self.focus.handle(event)
+        return True
+
+    def update(self):
+        """Refresh screen state before the widgets are polled (override for timed content)"""
+        pass
+
+    def render(self):
+        """Draw the widgets that changed and flush the LCD"""
+        self.update()
+        lcd = self.lcd
+        if self._clear:
+            # The framebuffer diff keeps the clear from reaching the display
+            # for cells that are redrawn with the same content
+            self._clear = False
+            lcd.clear()
+            for widget in self.widgets:
+                widget.dirty = True
+        for widget in self.widgets:
+            widget.update()
+            if widget.dirty:
+                widget.draw(lcd)
+                widget.dirty = False
+        lcd.flush()
+
+    def set_message(self, top, bottom=""):
+        """Replace the content with two centred lines"""
+        self.set_widgets([Label(0, top, align="center", width=self.lcd.num_cols),
+                          Label(1, bottom, align="center", width=self.lcd.num_cols)])
+
+    def show_message(self, top, bottom=""):
+        """Show two centred lines immediately (before a blocking operation)"""
+        self.set_message(top, bottom)
+        self.render()
+
+class MenuScreen(Screen):
+    """Scrollable menu opening a screen for the selected item"""
+
+    def __init__(self, lcd, buttons, items):
+        """Initialize the menu
+
+        Args:
+            items (list): (label, factory) pairs; factory() returns the Screen to open
+        """
+        super().__init__(lcd, buttons)
+
+        self.items = items
+        self.list = ListView([label for label, _ in items], self.open_item,
+                             height=lcd.num_rows, width=lcd.num_cols)
+        self.set_widgets([self.list], focus=self.list)
+
+    def open_item(self, index):
+        """Push the screen of a menu item"""
+        self.app.push(self.items[index][1]())
+
+class ScreenStack(BaseGUI):
+    """Stack of screens sharing the LCD and the button input.
+
+    Events go to the top screen, which is popped when its handle()
+    returns False. Each tick handles the queued events and then makes a
+    single render pass over the top screen.
+    """
+
+    def __init__(self, lcd, buttons=None):
+        """Initialize an empty stack"""
+        super().__init__(lcd, buttons)
+
+        self.screens = []
+
+    def top(self):
+        """Get the screen on top (None if the stack is empty)"""
+        return self.screens[-1] if self.screens else None
+
+    def push(self, screen):
+        """Show a screen on top of the current one"""
+        screen.app = self
+        self.screens.append(screen)
+        screen.enter()
+
+    def pop(self):
+        """Close the top screen and redraw the one below"""
+        screen = self.screens.pop()
+        screen.app = None
+        if self.screens:
+            self.screens[-1].invalidate()
+        return screen
+
+    def enter(self):
+        """Draw the top screen"""
+        self.render()
+
+    def handle(self, event):
+        """Route an event to the top screen (the bottom screen is never popped)"""
+        screen = self.top()
+        if screen is not None and not screen.handle(event) and len(self.screens) > 1:
+            self.pop()
+        return True
+
+    def tick(self):
+        """Handle the queued button events, then render once"""
+        super().tick()
+        self.render()
+        return True
+
+    def render(self):
+        """Render the top screen"""
+        screen = self.top()
+        if screen is not None:
+            screen.render()
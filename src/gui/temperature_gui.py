@@ -1,69 +1,56 @@
-import utime
-from machine import Pin
-from gui.base_gui import BaseGUI
+from gui.screen import Screen
+from gui.widgets import Label, ValueEditor
+from gui.buttons import PRESS, CHORD, UP, DOWN, SELECT
 
-class TemperatureGUI(BaseGUI):
+class TemperatureGUI(Screen):
     """Temperature monitor and control GUI"""
     
-    def __init__(self, lcd, select_button, up_button, down_button, temp_monitor):
+    def __init__(self, lcd, buttons, temp_monitor):
         """Initialize the Temperature GUI"""
-        super().__init__(lcd, up_button, down_button, select_button)
+        super().__init__(lcd, buttons)
         
         self.temp_monitor = temp_monitor
+        # Reused monitor state copy, so temperature and indicator always match
+        self.monitor_state = temp_monitor.snapshot()
         
         self.setting_mode = False
-    
-    def run(self):
-        """Run the temperature GUI"""
-        current_temp = 0.0
-        last_display_update = 0
         
-        current_temp = self.temp_monitor.get_current_temp()
-        self.display_temperature(current_temp)
+        cols = lcd.num_cols
+        self.view_widgets = [
+            Label(0, "Temperature:", align="center", width=cols),
+            Label(1, source=self.temperature_line, width=cols),
+        ]
+        self.target_editor = ValueEditor(1, temp_monitor.get_target_temp, temp_monitor.set_target_temp,
+                                         step=0.5, width=cols)
+        self.setting_widgets = [
+            Label(0, "Target Temp:", align="center", width=cols),
+            self.target_editor,
+        ]
+        self.set_widgets(self.view_widgets)
+    
+    def handle(self, event):
+        """Up+down leaves, select toggles target setting, up/down (held to repeat) adjust it"""
+        if event == CHORD | UP | DOWN:
+            return False
         
-        while True:
-            if self.is_up_down_pressed():
-                utime.sleep(0.2)  # Debounce
-                return
-            
-            if self.is_select_pressed():
-                self.setting_mode = not self.setting_mode
-                
-                if self.setting_mode:
-                    self.display_target_temp()
-                else:
-                    current_temp = self.temp_monitor.get_current_temp()
-                    self.display_temperature(current_temp)
+        if event == PRESS | SELECT:
+            self.setting_mode = not self.setting_mode
             
             if self.setting_mode:
-                if self.is_up_pressed():
-                    new_target = self.temp_monitor.get_target_temp() + 0.5
-                    self.temp_monitor.set_target_temp(new_target)
-                    self.display_target_temp()
-                
-                elif self.is_down_pressed():
-                    new_target = self.temp_monitor.get_target_temp() - 0.5
-                    self.temp_monitor.set_target_temp(new_target)
-                    self.display_target_temp()
+                self.set_widgets(self.setting_widgets, focus=self.target_editor)
             else:
-                current_time = utime.ticks_ms()
-                if utime.ticks_diff(current_time, last_display_update) > 2000:  # Update every 2 seconds
-                    current_temp = self.temp_monitor.get_current_temp()
-                    self.display_temperature(current_temp)
-                    last_display_update = current_time
-            
-            self.update_button_states()
-            utime.sleep(0.05)  # Small delay to prevent CPU overload
-    
-    def display_temperature(self, current_temp):
-        """Display current temperature with appropriate indicator"""
-        target_temp = self.temp_monitor.get_target_temp()
-        
-        indicator = "-" if current_temp > target_temp else "+"
+                self.set_widgets(self.view_widgets)
+            return True
         
-        self.lcd.display_temperature_screen(f"{current_temp:.1f}", indicator)
+        return super().handle(event)
     
-    def display_target_temp(self):
-        """Display the target temperature setting screen"""
-        target_temp = self.temp_monitor.get_target_temp()
-        self.lcd.display_target_temp_screen(target_temp)
+    def temperature_line(self):
+        """Get the centred temperature with the output indicator in the last column"""
+        state = self.temp_monitor.snapshot(self.monitor_state)
+        text = f"{state.current_temp:.1f}\1C"
+        # "-" while the cooling output is on
+        indicator = "-" if state.output > 0 else "+"
+        
+        width = self.lcd.num_cols - 1
+        line = " " * max(0, (self.lcd.num_cols - len(text)) // 2) + text
+        return line[:width] + " " * (width - len(line)) + indicator
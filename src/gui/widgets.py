@@ -0,0 +1,296 @@
+from gui.buttons import PRESS, REPEAT, CHORD, KIND_MASK, BUTTON_MASK, UP, DOWN, SELECT, LEFT, RIGHT
+
+class Widget:
+    """Retained-mode element owning a rectangle of LCD cells.
+
+    A widget redraws only when it is dirty: after invalidate(), after
+    handling input, or when update() sees its bound value change. Widgets
+    always paint their whole area, so no screen clear is needed between
+    frames.
+    """
+
+    def __init__(self, row, col=0, width=16, height=1):
+        """Initialize the widget's area (zero based)"""
+        self.row = row
+        self.col = col
+        self.width = width
+        self.height = height
+        self.dirty = True
+
+    def invalidate(self):
+        """Redraw on the next render pass"""
+        self.dirty = True
+
+    def update(self):
+        """Check the bound value and mark the widget dirty if it changed"""
+        pass
+
+    def handle(self, event):
+        """Handle a button event
+        Returns:
+            bool: True if the event was consumed
+        """
+        return False
+
+    def draw(self, lcd):
+        """Paint the widget's area into the LCD framebuffer"""
+        raise NotImplementedError("Subclasses must implement draw()")
+
+    def put_line(self, lcd, row, text, align="left"):
+        """Write text into one row of the area, padded/truncated to the width"""
+        text = text[:self.width]
+        pad = self.width - len(text)
+        if align == "center":
+            text = " " * (pad // 2) + text + " " * (pad - pad // 2)
+        else:
+            text = text + " " * pad
+        lcd.move_to(self.col, row)
+        lcd.putstr(text)
+
+class Label(Widget):
+    """One line of static text or text computed from a bound source"""
+
+    def __init__(self, row, text="", source=None, align="left", col=0, width=16):
+        """Initialize the label
+
+        Args:
+            text (str): Fixed text (ignored when source is given)
+            source (callable): Returns the text; polled on every render pass
+            align (str): "left" or "center"
+        """
+        super().__init__(row, col, width)
+        self.source = source
+        self.align = align
+        self.text = text if source is None else source()
+
+    def set_text(self, text):
+        """Change the text"""
+        if text != self.text:
+            self.text = text
+            self.dirty = True
+
+    def update(self):
+        """Pull the text from the source"""
+        if self.source is not None:
+            self.set_text(self.source())
+
+    def draw(self, lcd):
+        """Paint the text"""
+        self.put_line(lcd, self.row, self.text, self.align)
+
+class ListView(Widget):
+    """Scrollable list with a ">" marker on the selected item.
+
+    Up/down (held to repeat) move the selection with wraparound and
+    scroll the visible window; select calls on_select(index).
+    """
+
+    def __init__(self, items, on_select=None, row=0, height=2, width=16,
+                 empty_text=("No items", "")):
+        """Initialize the list
+
+        Args:
+            items (list or callable): Item labels, or a function returning them
+            on_select (callable): Called with the selected index
+            empty_text (tuple): Lines shown when there are no items
+        """
+        super().__init__(row, 0, width, height)
+        self.source = items if callable(items) else None
+        self.items = items() if callable(items) else items
+        self.on_select = on_select
+        self.empty_text = empty_text
+        self.index = 0
+        self.top = 0
+
+    def set_items(self, items):
+        """Replace the items and reset the selection"""
+        self.items = items
+        self.index = 0
+        self.top = 0
+        self.dirty = True
+
+    def update(self):
+        """Pull the items from the source"""
+        if self.source is not None:
+            items = self.source()
+            if items != self.items:
+                self.set_items(items)
+
+    def selected(self):
+        """Get the selected item (None if the list is empty)"""
+        if not self.items:
+            return None
+        return self.items[self.index]
+
+    def select(self, index):
+        """Select an item and scroll it into view"""
+        self.index = index
+        if self.index < self.top:
+            self.top = self.index
+        elif self.index >= self.top + self.height:
+            self.top = self.index - self.height + 1
+        self.dirty = True
+
+    def move(self, step):
+        """Move the selection by step items with wraparound"""
+        count = len(self.items)
+        if count:
+            self.select((self.index + step) % count)
+
+    def handle(self, event):
+        """Up/down move, select picks"""
+        kind = event & KIND_MASK
+        button = event & BUTTON_MASK
+        if kind != PRESS and kind != REPEAT:
+            return False
+        if button == UP:
+            self.move(-1)
+        elif button == DOWN:
+            self.move(1)
+        elif button == SELECT and kind == PRESS:
+            if self.items and self.on_select is not None:
+                self.on_select(self.index)
+        else:
+            return False
+        return True
+
+    def draw(self, lcd):
+        """Paint the visible window of items"""
+        if not self.items:
+            for i in range(self.height):
+                text = self.empty_text[i] if i < len(self.empty_text) else ""
+                self.put_line(lcd, self.row + i, text, "center")
+            return
+        for i in range(self.height):
+            index = self.top + i
+            if index >= len(self.items):
+                self.put_line(lcd, self.row + i, "")
+            elif index == self.index:
+                self.put_line(lcd, self.row + i, "> " + self.items[index])
+            else:
+                self.put_line(lcd, self.row + i, " " + self.items[index])
+
+class ValueEditor(Widget):
+    """Numeric value adjusted with up/down (held to repeat)"""
+
+    def __init__(self, row, get, set, step=0.5, fmt="{:.1f}\1C", minimum=None, maximum=None,
+                 align="center", width=16):
+        """Initialize the editor
+
+        Args:
+            get (callable): Returns the current value
+            set (callable): Stores a new value
+            step (float): Change per press or repeat
+            fmt (str): Display format
+        """
+        super().__init__(row, 0, width)
+        self.get = get
+        self.set = set
+        self.step = step
+        self.fmt = fmt
+        self.minimum = minimum
+        self.maximum = maximum
+        self.align = align
+        self.value = get()
+
+    def update(self):
+        """Pull the value (it may also change elsewhere, e.g. over the web)"""
+        value = self.get()
+        if value != self.value:
+            self.value = value
+            self.dirty = True
+
+    def handle(self, event):
+        """Up/down change the value by one step"""
+        kind = event & KIND_MASK
+        button = event & BUTTON_MASK
+        if kind != PRESS and kind != REPEAT:
+            return False
+        if button == UP:
+            value = self.value + self.step
+        elif button == DOWN:
+            value = self.value - self.step
+        else:
+            return False
+        if self.minimum is not None and value < self.minimum:
+            value = self.minimum
+        if self.maximum is not None and value > self.maximum:
+            value = self.maximum
+        self.set(value)
+        self.update()
+        return True
+
+    def draw(self, lcd):
+        """Paint the formatted value"""
+        self.put_line(lcd, self.row, self.fmt.format(self.value), self.align)
+
+class TextInput(Widget):
+    """Single-line text entry with a character wheel.
+
+    Up/down pick the character at the cursor, right accepts it, left
+    deletes the one before the cursor, select toggles the character set
+    and left+right submits through on_submit(text).
+    """
+
+    def __init__(self, row, charsets, text="", on_submit=None, on_charset=None,
+                 filler="_", width=16):
+        """Initialize the input
+
+        Args:
+            charsets (tuple): Character sets cycled by select
+            text (str): Initial text (cursor placed after it)
+            on_submit (callable): Called with the text on left+right
+            on_charset (callable): Called with the new charset index on select
+        """
+        super().__init__(row, 0, width)
+        self.charsets = charsets
+        self.charset = 0
+        self.char_index = 0
+        self.text = text
+        self.cursor = len(text)
+        self.on_submit = on_submit
+        self.on_charset = on_charset
+        self.filler = filler
+
+    def handle(self, event):
+        """Edit the text"""
+        if event == CHORD | LEFT | RIGHT:
+            if self.on_submit is not None:
+                self.on_submit(self.text)
+            return True
+
+        kind = event & KIND_MASK
+        button = event & BUTTON_MASK
+        if kind != PRESS and kind != REPEAT:
+            return False
+        chars = self.charsets[self.charset]
+        if button == UP:
+            self.char_index = (self.char_index + 1) % len(chars)
+        elif button == DOWN:
+            self.char_index = (self.char_index - 1) % len(chars)
+        elif button == LEFT:
+            if self.cursor > 0:
+                self.text = self.text[:self.cursor - 1] + self.text[self.cursor:]
+                self.cursor -= 1
+        elif button == RIGHT and kind == PRESS:
+            self.text = self.text[:self.cursor] + chars[self.char_index] + self.text[self.cursor + 1:]
+            self.cursor += 1
+        elif button == SELECT and kind == PRESS:
+            self.charset = (self.charset + 1) % len(self.charsets)
+            self.char_index = min(self.char_index, len(self.charsets[self.charset]) - 1)
+            if self.on_charset is not None:
+                self.on_charset(self.charset)
+        else:
+            return False
+        self.dirty = True
+        return True
+
+    def draw(self, lcd):
+        """Paint the text with the candidate character at the cursor"""
+        # Keep the cursor visible on texts longer than the widget
+        start = max(0, self.cursor - self.width + 1)
+        line = self.text
+        if self.cursor == len(line):
+            line += self.charsets[self.charset][self.char_index]
+        line = line[start:start + self.width]
+        self.put_line(lcd, self.row, line + self.filler * (self.width - len(line)))
@@ -54,9 +54,11 @@ class LcdApi:
         self.display_off()
         self.backlight_on()
         self.clear()
-        self.hal_write_command(self.LCD_ENTRY_MODE | self.LCD_ENTRY_INC)
-        self.hide_cursor()
-        self.display_on()
+        # Entry mode, then display on with the cursor hidden
+        self.hal_write_command_bulk(bytes([
+            self.LCD_ENTRY_MODE | self.LCD_ENTRY_INC,
+            self.LCD_ON_CTRL | self.LCD_ON_DISPLAY
+        ]))
 
     def clear(self):
         """Clears the LCD display and moves the cursor to the top left corner."""
@@ -144,8 +146,30 @@ class LcdApi:
     def putstr(self, string):
         # Write the indicated string to the LCD at the current cursor
         # position and advances the cursor position appropriately.
-        for char in string:
-            self.putchar(char)
+        # Each stretch that fits on the current line is sent as one bulk
+        # write; the controller advances its address by itself, so a
+        # move_to is only sent when the cursor wraps to another line.
+        start = 0
+        length = len(string)
+        while start < length:
+            if string[start] == '\n':
+                self.putchar('\n')
+                start += 1
+                continue
+            end = min(length, start + max(1, self.num_columns - self.cursor_x))
+            newline = string.find('\n', start, end)
+            if newline >= 0:
+                end = newline
+            self.hal_write_data_bulk(string, start, end)
+            self.cursor_x += end - start
+            if self.cursor_x >= self.num_columns:
+                self.cursor_x = 0
+                self.cursor_y += 1
+                self.implied_newline = True
+                if self.cursor_y >= self.num_lines:
+                    self.cursor_y = 0
+                self.move_to(self.cursor_x, self.cursor_y)
+            start = end
 
     def custom_char(self, location, charmap):
         # Write a character to one of the 8 CGRAM locations, available
@@ -153,9 +177,8 @@ class LcdApi:
         location &= 0x7
         self.hal_write_command(self.LCD_CGRAM | (location << 3))
         self.hal_sleep_us(40)
-        for i in range(8):
-            self.hal_write_data(charmap[i])
-            self.hal_sleep_us(40)
+        self.hal_write_data_bulk(charmap, 0, 8)
+        self.hal_sleep_us(40)
         self.move_to(self.cursor_x, self.cursor_y)
 
     def hal_backlight_on(self):
@@ -178,6 +201,23 @@ class LcdApi:
         # It is expected that a derived HAL class will implement this function.
         raise NotImplementedError
 
+    def hal_write_command_bulk(self, cmds, start=0, end=None):
+        # Write the commands cmds[start:end] to the LCD.
+        # A derived HAL class may override this to batch the transfer.
+        if end is None:
+            end = len(cmds)
+        for i in range(start, end):
+            self.hal_write_command(cmds[i])
+
+    def hal_write_data_bulk(self, data, start=0, end=None):
+        # Write data[start:end] (bytes or str) to the LCD.
+        # A derived HAL class may override this to batch the transfer.
+        if end is None:
+            end = len(data)
+        is_str = isinstance(data, str)
+        for i in range(start, end):
+            self.hal_write_data(ord(data[i]) if is_str else data[i])
+
     def hal_sleep_us(self, usecs):
         # Sleep for some time (given in microseconds)
         time.sleep_us(usecs)
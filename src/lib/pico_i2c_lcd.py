@@ -12,13 +12,21 @@ MASK_E  = 0x04       # P2
 SHIFT_BACKLIGHT = 3  # P3
 SHIFT_DATA      = 4  # P4-P7
 
+# Largest run of bytes packed into one I2C transaction (one 40 column line)
+BULK_BYTES = 40
+
 class I2cLcd(LcdApi):
     """Implements a HD44780 character LCD connected via PCF8574 on I2C."""
 
     def __init__(self, i2c, i2c_addr, num_lines, num_columns):
         self.i2c = i2c
         self.i2c_addr = i2c_addr
-        self.i2c.writeto(self.i2c_addr, bytes([0]))
+        # Every LCD byte becomes 4 PCF8574 frames (high/low nibble, E high/low)
+        self._frames = bytearray(4 * BULK_BYTES)
+        self._frames_mv = memoryview(self._frames)
+        self.backlight = False
+        self._frames[0] = 0
+        self.i2c.writeto(self.i2c_addr, self._frames_mv[:1])
         utime.sleep_ms(20)   # Allow LCD time to powerup
         # Send reset 3 times
         self.hal_write_init_nibble(self.LCD_FUNCTION_RESET)
@@ -43,45 +51,81 @@ class I2cLcd(LcdApi):
         This particular function is only used during initialization.
         """
         byte = ((nibble >> 4) & 0x0f) << SHIFT_DATA
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        gc.collect()
+        self._frames[0] = byte | MASK_E
+        self._frames[1] = byte
+        self.i2c.writeto(self.i2c_addr, self._frames_mv[:2])
         
     def hal_backlight_on(self):
         """Allows the hal layer to turn the backlight on."""
-        self.i2c.writeto(self.i2c_addr, bytes([1 << SHIFT_BACKLIGHT]))
-        gc.collect()
+        self._frames[0] = 1 << SHIFT_BACKLIGHT
+        self.i2c.writeto(self.i2c_addr, self._frames_mv[:1])
         
     def hal_backlight_off(self):
         """Allows the hal layer to turn the backlight off."""
-        self.i2c.writeto(self.i2c_addr, bytes([0]))
-        gc.collect()
+        self._frames[0] = 0
+        self.i2c.writeto(self.i2c_addr, self._frames_mv[:1])
         
     def hal_write_command(self, cmd):
         """Write a command to the LCD. Data is latched on the falling edge of E."""
-        byte = ((self.backlight << SHIFT_BACKLIGHT) |
-                (((cmd >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        byte = ((self.backlight << SHIFT_BACKLIGHT) |
-                ((cmd & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
+        self._pack_byte(0, 0, cmd)
+        self.i2c.writeto(self.i2c_addr, self._frames_mv[:4])
         if cmd <= 3:
             # The home and clear commands require a worst case delay of 4.1 msec
             utime.sleep_ms(5)
-        gc.collect()
 
     def hal_write_data(self, data):
         """Write data to the LCD. Data is latched on the falling edge of E."""
-        byte = (MASK_RS |
+        self._pack_byte(0, MASK_RS, data)
+        self.i2c.writeto(self.i2c_addr, self._frames_mv[:4])
+
+    def hal_write_command_bulk(self, cmds, start=0, end=None):
+        """Write a run of commands to the LCD in as few transactions as possible.
+        
+        Clear and home still get their 5 msec delay before the next command.
+        """
+        if end is None:
+            end = len(cmds)
+        count = 0
+        for i in range(start, end):
+            cmd = cmds[i]
+            self._pack_byte(count * 4, 0, cmd)
+            count += 1
+            if count == BULK_BYTES or cmd <= 3:
+                self.i2c.writeto(self.i2c_addr, self._frames_mv[:count * 4])
+                count = 0
+                if cmd <= 3:
+                    utime.sleep_ms(5)
+        if count:
+            self.i2c.writeto(self.i2c_addr, self._frames_mv[:count * 4])
+
+    def hal_write_data_bulk(self, data, start=0, end=None):
+        """Write a run of data bytes (bytes or str) in one I2C transaction.
+        
+        Runs longer than BULK_BYTES are split into BULK_BYTES sized transactions.
+        """
+        if end is None:
+            end = len(data)
+        is_str = isinstance(data, str)
+        count = 0
+        for i in range(start, end):
+            self._pack_byte(count * 4, MASK_RS, ord(data[i]) if is_str else data[i])
+            count += 1
+            if count == BULK_BYTES:
+                self.i2c.writeto(self.i2c_addr, self._frames_mv[:count * 4])
+                count = 0
+        if count:
+            self.i2c.writeto(self.i2c_addr, self._frames_mv[:count * 4])
+
+    def _pack_byte(self, offset, rs, value):
+        """Pack one LCD byte into 4 frames of the transmit buffer at offset."""
+        frames = self._frames
+        byte = (rs |
                 (self.backlight << SHIFT_BACKLIGHT) |
-                (((data >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        byte = (MASK_RS |
+                (((value >> 4) & 0x0f) << SHIFT_DATA))
+        frames[offset] = byte | MASK_E
+        frames[offset + 1] = byte
+        byte = (rs |
                 (self.backlight << SHIFT_BACKLIGHT) |
-                ((data & 0x0f) << SHIFT_DATA))      
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        gc.collect()
+                ((value & 0x0f) << SHIFT_DATA))
+        frames[offset + 2] = byte | MASK_E
+        frames[offset + 3] = byte
@@ -5,23 +5,43 @@ from tools.ds import DS
 from tools.wifi import WiFi
 from gui.gui import GUI
 from monitor.temperature_monitor import TemperatureMonitor
+from runtime.runtime import Runtime
+from storage.data_logger import DataLogger
+from control.controllers import create_controller
+
+# Optional probe labels keyed by DS18X20 ROM ID (hex), e.g.
+# {"28ff641f6b16045c": "cold plate", "28ff8a2e6b160431": "hot side"}
+PROBE_LABELS = {}
+
+# Run the cooling control loop on core 1 instead of as an asyncio task
+CONTROL_ON_CORE1 = False
+
+# Cooling controller, e.g.
+# {"type": "bang_bang", "hysteresis": 0.5, "min_on_s": 30, "min_off_s": 30}
+# {"type": "pid", "kp": 0.5, "ki": 0.005, "kd": 0.0, "pwm_freq": 1000}
+CONTROLLER_CONFIG = {"type": "bang_bang", "hysteresis": 0.5, "min_on_s": 30, "min_off_s": 30}
 
 def main():
     """Main entry point for the PicoFreezer application.
 
     Initializes all components including sensors, WiFi, LCD, temperature monitor,
-    and GUI, then starts the main loop.
+    and GUI, then runs them as tasks of the asyncio runtime.
     """
     print("Initializing DS temperature sensor...")
-    ds_sensor = DS(data_pin=2)
+    ds_sensor = DS(data_pin=2, labels=PROBE_LABELS)
 
     print("PicoFreezer starting up...")
 
     print("Initializing WiFi module...")
     wifi_manager = WiFi()
 
+    print("Opening data log...")
+    data_logger = DataLogger(probe_count=max(1, len(ds_sensor.roms)))
+
     print("Creating temperature monitor...")
-    temp_monitor = TemperatureMonitor(ds_sensor=ds_sensor, led_pin=16, wifi_manager=wifi_manager)
+    temp_monitor = TemperatureMonitor(ds_sensor=ds_sensor, led_pin=16, wifi_manager=wifi_manager,
+                                      data_logger=data_logger,
+                                      controller=create_controller(CONTROLLER_CONFIG))
 
     print("Initializing LCD...")
     lcd_display = LCD(
@@ -36,22 +56,23 @@ def main():
     lcd_display.clear()
     lcd_display.center_text("PicoFreezer", 0)
     lcd_display.center_text("Starting...", 1)
+    lcd_display.flush()
     utime.sleep(1)
 
+    runtime = None
     try:
-        print("Starting temperature monitor thread...")
-        temp_monitor.start_monitoring()
-
-        print("Waiting for initial temperature reading...")
-        utime.sleep(2)
-
         print("Starting GUI...")
         gui = GUI(lcd=lcd_display, temp_monitor=temp_monitor, wifi_manager=wifi_manager)
-        gui.run()
+
+        print("Starting runtime...")
+        runtime = Runtime(temp_monitor, gui, control_on_core1=CONTROL_ON_CORE1, wifi=wifi_manager)
+        runtime.run()
 
     except KeyboardInterrupt:
         print("Program interrupted. Cleaning up...")
     finally:
+        if runtime is not None:
+            runtime.stop()
         temp_monitor.stop_monitoring()
 
         utime.sleep(0.5)
@@ -62,8 +83,10 @@ def main():
         lcd_display.clear()
         lcd_display.center_text("Shutting down", 0)
         lcd_display.center_text("Goodbye!", 1)
+        lcd_display.flush()
         utime.sleep(1)
         lcd_display.clear()
+        lcd_display.flush()
 
         print("Program terminated cleanly.")
 
@@ -0,0 +1,199 @@
+import _thread
+from array import array
+
+class HistoryTier:
+    """Fixed-size ring of min/avg/max rollups over fixed-period buckets.
+
+    Temperatures are stored in centi-degrees (int16), output duty in percent.
+    Samples are folded into the open bucket; when a sample lands in a later
+    bucket the open one is closed into the ring and passed on to the parent
+    tier. Adding a sample allocates nothing.
+    """
+
+    def __init__(self, capacity, period, parent=None):
+        """Preallocate the ring
+
+        Args:
+            capacity (int): Number of closed buckets kept
+            period (int): Bucket length in seconds
+            parent (HistoryTier): Coarser tier fed with every closed bucket
+        """
+        self.capacity = capacity
+        self.period = period
+        self.parent = parent
+
+        self.times = array('l', [0] * capacity)
+        self.mins = array('h', [0] * capacity)
+        self.avgs = array('h', [0] * capacity)
+        self.maxs = array('h', [0] * capacity)
+        self.duty = bytearray(capacity)
+        self.head = 0       # Next slot to write
+        self.count = 0      # Closed buckets stored
+
+        # Open bucket accumulator
+        self.bucket = 0
+        self.lo = 0
+        self.hi = 0
+        self.total = 0
+        self.samples = 0
+        self.on_samples = 0
+
+    def add(self, timestamp, lo, hi, total, samples, on_samples):
+        """Fold samples (already summarised) into the open bucket"""
+        bucket = timestamp - timestamp % self.period
+        if self.samples and bucket != self.bucket:
+            self.close()
+
+        if not self.samples:
+            self.bucket = bucket
+            self.lo = lo
+            self.hi = hi
+        else:
+            if lo < self.lo:
+                self.lo = lo
+            if hi > self.hi:
+                self.hi = hi
+        self.total += total
+        self.samples += samples
+        self.on_samples += on_samples
+
+    def close(self):
+        """Store the open bucket in the ring and pass it to the parent tier"""
+        if not self.samples:
+            return
+
+        i = self.head
+        self.times[i] = self.bucket
+        self.mins[i] = self.lo
+        self.avgs[i] = self.total // self.samples
+        self.maxs[i] = self.hi
+        self.duty[i] = self.on_samples * 100 // self.samples
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+        if self.parent is not None:
+            self.parent.add(self.bucket, self.lo, self.hi,
+                            self.total, self.samples, self.on_samples)
+        self.samples = 0
+        self.total = 0
+        self.on_samples = 0
+
+    def slot(self, n):
+        """Get the ring index of the n-th oldest stored bucket"""
+        return (self.head - self.count + n) % self.capacity
+
+    def oldest_time(self):
+        """Get the start time of the oldest stored bucket (None if empty)"""
+        if not self.count:
+            return None
+        return self.times[self.slot(0)]
+
+    def first_at_or_after(self, timestamp):
+        """Get n of the oldest stored bucket starting at or after timestamp"""
+        lo = 0
+        hi = self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.times[self.slot(mid)] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+class TemperatureHistory:
+    """In-memory temperature and output history in three resolution tiers.
+
+    Per-second, 1-minute and 1-hour buckets each keep min/avg/max
+    temperature and output duty. With the default sizes that is 5 minutes
+    at 1 s, 6 hours at 1 min and 7 days at 1 h in about 9 KB of RAM.
+    """
+
+    def __init__(self, raw_capacity=300, minute_capacity=360, hour_capacity=168):
+        """Preallocate all tiers"""
+        self.hours = HistoryTier(hour_capacity, 3600)
+        self.minutes = HistoryTier(minute_capacity, 60, self.hours)
+        self.seconds = HistoryTier(raw_capacity, 1, self.minutes)
+        self.tiers = (self.seconds, self.minutes, self.hours)
+
+        self.lock = _thread.allocate_lock()
+
+    def append(self, timestamp, temp, output_on):
+        """Record a reading in degrees Celsius"""
+        self.append_centi(timestamp, round(temp * 100), output_on)
+
+    def append_centi(self, timestamp, centi, output_on):
+        """Record a reading in centi-degrees (allocation free)
+
+        Args:
+            timestamp (int): Seconds (utime.time())
+            centi (int): Temperature in hundredths of a degree
+            output_on (bool): Cooling output state
+        """
+        if centi > 32767:
+            centi = 32767
+        elif centi < -32768:
+            centi = -32768
+        with self.lock:
+            self.seconds.add(timestamp, centi, centi, centi, 1, 1 if output_on else 0)
+
+    def tier_for(self, resolution):
+        """Get the tier storing rows of the given resolution (seconds)"""
+        for tier in self.tiers:
+            if tier.period == resolution:
+                return tier
+        raise ValueError(f"Unsupported resolution: {resolution}")
+
+    def best_resolution(self, start):
+        """Get the finest resolution whose tier still reaches back to start
+
+        When none does (e.g. in the first hour of uptime), the tier reaching
+        furthest back is used, so an empty coarse tier is never picked over
+        finer ones holding rows.
+        """
+        furthest = None
+        furthest_time = None
+        for tier in self.tiers:
+            oldest = tier.oldest_time()
+            if oldest is None:
+                continue
+            if oldest <= start:
+                return tier.period
+            if furthest is None or oldest < furthest_time:
+                furthest = tier
+                furthest_time = oldest
+        return furthest.period if furthest is not None else self.seconds.period
+
+    def rows(self, start, end, resolution=None):
+        """Iterate over stored rows in [start, end)
+
+        Args:
+            start (int): First timestamp (seconds)
+            end (int): Timestamp after the last row (seconds)
+            resolution (int): 1, 60 or 3600; None picks the finest covering start
+        Yields:
+            tuple: (timestamp, min, avg, max, duty) in centi-degrees and percent
+        """
+        if resolution is None:
+            resolution = self.best_resolution(start)
+        tier = self.tier_for(resolution)
+
+        # Rows are located by timestamp on every step, so buckets pushed
+        # (or dropped from a full ring) while iterating never skip a row
+        next_time = start
+        while True:
+            with self.lock:
+                n = tier.first_at_or_after(next_time)
+                if n >= tier.count:
+                    break
+                i = tier.slot(n)
+                row = (tier.times[i], tier.mins[i], tier.avgs[i],
+                       tier.maxs[i], tier.duty[i])
+            if row[0] >= end:
+                break
+            yield row
+            next_time = row[0] + 1
+
+    def query(self, start, end, resolution=None):
+        """Get the rows in [start, end) as a list (see rows())"""
+        return list(self.rows(start, end, resolution))
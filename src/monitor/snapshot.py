@@ -0,0 +1,75 @@
+class MonitorState:
+    """Monitor readings and settings taken at one instant"""
+
+    def __init__(self, probes=0):
+        """Initialize an empty state
+
+        Args:
+            probes (int): Number of sensor probes
+        """
+        self.current_temp = 0.0
+        # Latest reading of each probe (None for a failed read)
+        self.probe_temps = [None] * probes
+        self.target_temp = 0.0
+        # Cooling output level (0.0 off to 1.0 full)
+        self.output = 0.0
+        # utime.ticks_ms() when the state was published
+        self.timestamp_ms = 0
+        # Publication count (even) the state was read at
+        self.version = 0
+
+    def copy_from(self, other):
+        """Copy every field of another state (no allocation once the probe count matches)"""
+        self.current_temp = other.current_temp
+        probes = self.probe_temps
+        if len(probes) != len(other.probe_temps):
+            self.probe_temps = list(other.probe_temps)
+        else:
+            for i in range(len(probes)):
+                probes[i] = other.probe_temps[i]
+        self.target_temp = other.target_temp
+        self.output = other.output
+        self.timestamp_ms = other.timestamp_ms
+
+class StateSnapshot:
+    """Monitor state shared between the cores under a sequence lock.
+
+    The writer bumps the sequence number to odd, updates the fields in
+    place and bumps it back to even. Readers copy the fields and retry
+    while the number was odd or changed under them, so they always get a
+    consistent state and never block the writer. Writers must be
+    serialised among themselves (the monitor's lock does that).
+    """
+
+    def __init__(self, probes=0):
+        """Initialize with an empty state"""
+        self.sequence = 0
+        self.state = MonitorState(probes)
+
+    def begin_write(self):
+        """Start updating the state (readers retry until end_write)"""
+        self.sequence += 1
+
+    def end_write(self):
+        """Publish the updated state"""
+        self.sequence += 1
+
+    def read(self, into=None):
+        """Get a consistent copy of the state
+
+        Args:
+            into (MonitorState): State to copy into (default: a new one)
+        Returns:
+            MonitorState: The copy, with version set to the publication count
+        """
+        if into is None:
+            into = MonitorState(len(self.state.probe_temps))
+        while True:
+            # A write takes a few microseconds, so spinning beats blocking
+            sequence = self.sequence
+            if sequence & 1:
+                continue
+            into.copy_from(self.state)
+            if self.sequence == sequence:
+                into.version = sequence
+                return into
@@ -1,85 +1,260 @@
 import _thread
 import utime
-from machine import Pin
+from machine import Pin, PWM
 from web.server import WebServer
+from monitor.history import TemperatureHistory
+from monitor.snapshot import StateSnapshot
+from control.controllers import create_controller
+from tools import instrumentation
+
+SAMPLE_US = instrumentation.histogram("monitor_sample_us", "Time spent in one sample() call")
+CONTROL_US = instrumentation.histogram("control_update_us", "Time spent in one controller tick")
+LOCK_HELD_US = instrumentation.histogram("monitor_lock_held_us", "Time the monitor lock is held")
+READINGS = instrumentation.counter("sensor_readings_total", "Temperature readings collected")
 
 class TemperatureMonitor:
     """Manages temperature monitoring and control using a DS sensor and LED indicator."""
 
-    def __init__(self, ds_sensor, led_pin=16, wifi_manager=None):
-        """Initialize the temperature monitor"""
+    # Time between the starts of two sensor conversions
+    SAMPLE_INTERVAL_MS = 1000
+    
+    # Adaptive sampling modes: (resolution bits, sample interval ms)
+    FAST_SAMPLING = (9, 250)
+    PRECISE_SAMPLING = (12, SAMPLE_INTERVAL_MS)
+    # Sample fast while the temperature moves faster than this (C per minute)
+    FAST_RATE = 1.0
+    # ... or while it is further than this from the target (C)
+    PRECISE_BAND = 1.0
+    # The rate of change is measured between readings this far apart
+    RATE_WINDOW_MS = 30000
+    # Smallest change that counts as movement, per resolution: one
+    # quantization step after the driver rounds readings to 0.1 C
+    RESOLUTION_STEP = {9: 0.5, 10: 0.3, 11: 0.2, 12: 0.1}
+    # Least time spent in a sampling mode before switching again
+    MIN_MODE_MS = 30000
+    # Seconds between records written to the flash data log
+    LOG_INTERVAL_S = 10
+
+    def __init__(self, ds_sensor, led_pin=16, wifi_manager=None, adaptive_sampling=True,
+                 data_logger=None, controller=None):
+        """Initialize the temperature monitor
+
+        Args:
+            controller (Controller): Cooling controller (default: bang-bang)
+        """
         self.ds_sensor = ds_sensor
+        self.data_logger = data_logger
         self.led = Pin(led_pin, Pin.OUT)
         
+        # Cooling output driven by the controller (PWM for duty-cycle controllers)
+        self.controller = controller if controller is not None else create_controller({})
+        self.pwm = None
+        if self.controller.uses_pwm:
+            self.pwm = PWM(self.led)
+            self.pwm.freq(self.controller.pwm_freq)
+            self.pwm.duty_u16(0)
+        self.output = 0.0
+        self.last_control_ms = utime.ticks_ms()
+        
         self.wifi_manager = wifi_manager
         self.web_server = None
         
-        self.wifi_connected = False if wifi_manager is None else wifi_manager.is_connected()
+        # Start as disconnected so a link that is already up starts the server
+        self.wifi_connected = False
         
         initial_temp = self.ds_sensor.get_temperature()
         self.current_temp = initial_temp if initial_temp is not None else 0.0
         
         self.target_temp = 20.0
         
-        self.lock = _thread.allocate_lock()
+        # Bumped on every new reading or target change (for live listeners)
+        self.update_count = 0
+        
+        # Rolling per-second / per-minute / per-hour history
+        self.history = TemperatureHistory()
+        self.last_log_time = None
         
-        self.running = True
+        # Sampling policy state
+        self.adaptive_sampling = adaptive_sampling
+        self.sample_interval_ms = self.SAMPLE_INTERVAL_MS
+        self.fast_sampling = False
+        self.temp_rate = 0.0
+        # Reading the rate window started from (None: start on the next reading)
+        self.rate_start_temp = None
+        self.rate_start_ms = 0
+        now = utime.ticks_ms()
+        # The first mode change may happen immediately
+        self.mode_since_ms = utime.ticks_add(now, -self.MIN_MODE_MS)
+        self.last_sample_ms = utime.ticks_add(now, -self.SAMPLE_INTERVAL_MS)
         
-        self.thread_id = None
+        # Serialises the writers; readers use the snapshot instead
+        self.lock = _thread.allocate_lock()
+        
+        # Consistent state for readers on either core (see snapshot())
+        self.state_snapshot = StateSnapshot(len(self.ds_sensor.temps))
+        self._publish()
         
     
     def set_web_server(self, web_server):
         """Set reference to web server"""
         self.web_server = web_server
     
-    def start_monitoring(self):
-        """Start the monitoring thread on the second core"""
-        if self.thread_id is None:  # Only start if not already running
-            self.running = True
-            self.thread_id = _thread.start_new_thread(self._monitor_loop, ())
-    
     def stop_monitoring(self):
-        """Stop the monitoring thread"""
-        self.running = False
+        """Turn the output off and flush the data log (on shutdown)"""
+        self.output_off()
         
-        # Turn off the LED when stopping
+        # Keep the readings still waiting in RAM
+        if self.data_logger is not None:
+            self.data_logger.flush()
+    
+    def sample(self):
+        """Advance the sensor conversion without blocking
+        Returns:
+            float: New temperature, or None if no new reading is available
+        """
+        start = utime.ticks_us()
+        temp = self._sample()
+        SAMPLE_US.observe(utime.ticks_diff(utime.ticks_us(), start))
+        if temp is not None:
+            READINGS.inc()
+            instrumentation.sample_memory()
+        return temp
+    
+    def _sample(self):
+        """Body of sample()"""
+        # Start the next conversion once the sample interval is up
+        now = utime.ticks_ms()
+        if (not self.ds_sensor.is_converting() and
+                utime.ticks_diff(now, self.last_sample_ms) >= self.sample_interval_ms):
+            if self.ds_sensor.start_conversion():
+                self.last_sample_ms = now
+        
+        # Collect the reading if the conversion has finished
+        if not self.ds_sensor.poll():
+            return None
+        temp = self.ds_sensor.read_latest()
+        if temp is None:
+            return None
+        
+        if self.adaptive_sampling:
+            self._update_sampling(temp)
+        
+        # Update current temperature (thread-safe)
         with self.lock:
-            self.led.value(0)
-    
-    def _monitor_loop(self):
-        """Continuous monitoring loop (runs on second core)"""
-        while self.running:
-            try:
-                # Measure temperature
-                temp = self.ds_sensor.get_temperature()
-                
-                # Update current temperature (thread-safe)
-                with self.lock:
-                    if temp is not None:
-                        self.current_temp = temp
-                    
-                    # Control LED based on temperature threshold
-                    if self.current_temp > self.target_temp:
-                        self.led.value(1)  # Turn on cooling
-                    else:
-                        self.led.value(0)  # Turn off cooling
-                
-                # Check WiFi status and manage web server
-                self._manage_web_server()
-                
-                # Sleep to avoid excessive readings
-                utime.sleep(1)
-                
-                # Check if we should exit more frequently
-                if not self.running:
-                    break
-                    
-            except Exception as e:
-                print(f"Error in temperature monitor: {e}")
-                utime.sleep(5)  # Wait a bit longer if there's an error
-    
-    def _manage_web_server(self):
-        """Manage the web server based on WiFi connection status"""
+            held = utime.ticks_us()
+            self.current_temp = temp
+            self._publish()
+            self.update_count += 1
+        LOCK_HELD_US.observe(utime.ticks_diff(utime.ticks_us(), held))
+        
+        now_s = utime.time()
+        output_on = self.output > 0
+        # One conversion per reading; round() as int() turns e.g. -18.9 C into -1889
+        self.history.append_centi(now_s, round(temp * 100), output_on)
+        
+        if self.data_logger is not None and (
+                self.last_log_time is None or now_s - self.last_log_time >= self.LOG_INTERVAL_S):
+            self.last_log_time = now_s
+            self.data_logger.log(now_s, self.ds_sensor.temps, self.target_temp, output_on)
+        return temp
+    
+    def ms_until_next_sample(self):
+        """Get the milliseconds until sample() has work to do"""
+        if self.ds_sensor.is_converting():
+            return self.ds_sensor.ms_until_ready()
+        elapsed = utime.ticks_diff(utime.ticks_ms(), self.last_sample_ms)
+        return max(0, self.sample_interval_ms - elapsed)
+    
+    def update_output(self):
+        """Tick the controller and drive the cooling output"""
+        start = utime.ticks_us()
+        now = utime.ticks_ms()
+        dt = utime.ticks_diff(now, self.last_control_ms) / 1000
+        self.last_control_ms = now
+        
+        with self.lock:
+            held = utime.ticks_us()
+            output = self.controller.update(self.current_temp, self.target_temp, dt)
+            self._apply_output(output)
+            self._publish()
+        end = utime.ticks_us()
+        LOCK_HELD_US.observe(utime.ticks_diff(end, held))
+        CONTROL_US.observe(utime.ticks_diff(end, start))
+    
+    def output_off(self):
+        """Reset the controller and turn the cooling output off"""
+        with self.lock:
+            self.controller.reset()
+            self._apply_output(0.0)
+            self._publish()
+    
+    def _apply_output(self, output):
+        """Set the output pin (PWM duty or on/off); call with the lock held"""
+        self.output = output
+        if self.pwm is not None:
+            self.pwm.duty_u16(int(output * 65535))
+        else:
+            self.led.value(1 if output > 0 else 0)
+    
+    def _publish(self):
+        """Copy the current state into the snapshot; call with the lock held"""
+        snapshot = self.state_snapshot
+        state = snapshot.state
+        snapshot.begin_write()
+        state.current_temp = self.current_temp
+        probes = state.probe_temps
+        temps = self.ds_sensor.temps
+        for i in range(len(probes)):
+            probes[i] = temps[i]
+        state.target_temp = self.target_temp
+        state.output = self.output
+        state.timestamp_ms = utime.ticks_ms()
+        snapshot.end_write()
+    
+    def _update_sampling(self, temp):
+        """Pick fast/coarse or slow/precise sampling from the latest reading
+
+        The rate of change is measured over RATE_WINDOW_MS, ignoring changes
+        of one quantization step, so sensor noise near the target does not
+        look like movement. A mode is kept for at least MIN_MODE_MS. Runs
+        between conversions, so a resolution change applies to the next one.
+        """
+        now = utime.ticks_ms()
+        if self.rate_start_temp is None:
+            self.rate_start_temp = temp
+            self.rate_start_ms = now
+        else:
+            elapsed = utime.ticks_diff(now, self.rate_start_ms)
+            if elapsed >= self.RATE_WINDOW_MS:
+                change = abs(temp - self.rate_start_temp)
+                step = self.RESOLUTION_STEP.get(self.ds_sensor.resolution, 0.1)
+                # Small margin for the float error of the rounded readings
+                self.temp_rate = change * 60000 / elapsed if change > step + 0.01 else 0.0
+                self.rate_start_temp = temp
+                self.rate_start_ms = now
+        
+        error = abs(temp - self.target_temp)
+        if self.fast_sampling:
+            # Require both to settle (with margin) before going back to precise
+            fast = self.temp_rate >= self.FAST_RATE / 2 or error > self.PRECISE_BAND / 2
+        else:
+            fast = self.temp_rate >= self.FAST_RATE or error > self.PRECISE_BAND
+        
+        if fast != self.fast_sampling and utime.ticks_diff(now, self.mode_since_ms) >= self.MIN_MODE_MS:
+            self.fast_sampling = fast
+            self.mode_since_ms = now
+            # Readings at the old resolution would skew the next rate window
+            self.rate_start_temp = None
+            bits, interval = self.FAST_SAMPLING if fast else self.PRECISE_SAMPLING
+            self.ds_sensor.set_resolution(bits)
+            self.sample_interval_ms = interval
+    
+    def manage_web_server(self):
+        """Start or stop the web server when the WiFi connection status changes
+
+        Must be called from the asyncio runtime; clients are served by the
+        server's own tasks.
+        """
         if not self.wifi_manager:
             return
         
@@ -99,10 +274,6 @@ class TemperatureMonitor:
             
             # Update tracked status
             self.wifi_connected = current_status
-        
-        # If server is running, process client requests
-        if self.web_server and self.web_server.is_running:
-            self.web_server.update()
     
     def _start_web_server(self):
         """Start the web server if not already running"""
@@ -119,17 +290,36 @@ class TemperatureMonitor:
         if self.web_server and self.web_server.is_running:
             self.web_server.stop()
     
+    def snapshot(self, into=None):
+        """Get current temperature, probe temperatures, target, output and time
+        as one consistent copy, without blocking the control loop
+
+        Args:
+            into (MonitorState): State to reuse (default: a new one)
+        Returns:
+            MonitorState: The copy
+        """
+        return self.state_snapshot.read(into)
+    
     def get_current_temp(self):
-        """Get the current temperature (thread-safe)"""
-        with self.lock:
-            return self.current_temp
+        """Get the current temperature (thread-safe; use snapshot() for several values)"""
+        return self.current_temp
     
     def set_target_temp(self, target):
         """Set the target temperature (thread-safe)"""
         with self.lock:
             self.target_temp = target
+            self._publish()
+            self.update_count += 1
     
     def get_target_temp(self):
         """Get the target temperature (thread-safe)"""
-        with self.lock:
-            return self.target_temp
+        return self.target_temp
+    
+    def get_update_count(self):
+        """Get the counter bumped by every new reading or target change"""
+        return self.update_count
+    
+    def get_output(self):
+        """Get the cooling output level (0.0 off to 1.0 full)"""
+        return self.output
@@ -0,0 +1,173 @@
+import _thread
+import utime
+
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+class Runtime:
+    """Cooperative scheduler running the PicoFreezer subsystems as asyncio tasks.
+
+    Sensing, control, HTTP serving, WiFi management, LCD rendering and button
+    input each run as their own task and yield between steps, so one subsystem only delays
+    the others by a single step. The control task can instead be pinned to
+    core 1 as a plain thread loop.
+    """
+
+    # Task periods (ms); the control task uses the controller's own period
+    HTTP_PERIOD_MS = 500
+    WIFI_PERIOD_MS = 250
+    RENDER_PERIOD_MS = 100
+    # Input polling period when interrupts cannot wake the input task
+    INPUT_PERIOD_MS = 50
+    # Longest sleep of the input task between button events
+    INPUT_IDLE_MS = 1000
+
+    def __init__(self, temp_monitor, gui=None, control_on_core1=False, trace=False, wifi=None):
+        """Initialize the runtime
+
+        Args:
+            temp_monitor (TemperatureMonitor): Sensing, control and web server owner
+            gui (BaseGUI): Top level screen driven by the input/render tasks
+            control_on_core1 (bool): Run the control loop on core 1 instead of as a task
+            trace (bool): Print a line for every task step
+            wifi (WiFi): Connection state machine advanced by the WiFi task
+        """
+        self.temp_monitor = temp_monitor
+        self.gui = gui
+        self.control_on_core1 = control_on_core1
+        self.trace = trace
+        self.wifi = wifi
+        self.running = False
+        
+        # Steps run by each task
+        self.task_runs = {"sense": 0, "control": 0, "http": 0, "render": 0, "input": 0,
+                          "wifi": 0}
+    
+    def run(self):
+        """Run all tasks until stop() is called"""
+        asyncio.run(self.main())
+    
+    def stop(self):
+        """Ask every task (and the core 1 control loop) to exit"""
+        self.running = False
+    
+    async def main(self):
+        """Start the tasks and wait until the runtime is stopped"""
+        self.running = True
+        
+        if self.control_on_core1:
+            _thread.start_new_thread(self._control_core1, ())
+        else:
+            asyncio.create_task(self._control_task())
+        
+        asyncio.create_task(self._sense_task())
+        asyncio.create_task(self._http_task())
+        if self.wifi is not None:
+            asyncio.create_task(self._wifi_task())
+        if self.gui is not None:
+            asyncio.create_task(self._input_task())
+            asyncio.create_task(self._render_task())
+        
+        while self.running:
+            await asyncio.sleep(0.1)
+    
+    def _step(self, name):
+        """Count (and optionally trace) one task step"""
+        self.task_runs[name] += 1
+        if self.trace:
+            print(f"{utime.ticks_ms()} {name}")
+    
+    async def _sense_task(self):
+        """Start conversions and collect readings without waiting on the sensor"""
+        while self.running:
+            try:
+                self.temp_monitor.sample()
+            except Exception as e:
+                print(f"Error in sense task: {e}")
+            self._step("sense")
+            await asyncio.sleep(max(1, self.temp_monitor.ms_until_next_sample()) / 1000)
+    
+    async def _control_task(self):
+        """Drive the cooling output on a fixed period"""
+        while self.running:
+            self._control_step()
+            await asyncio.sleep(self.temp_monitor.controller.period_ms / 1000)
+    
+    def _control_core1(self):
+        """Control loop pinned to core 1 (runs outside the event loop)"""
+        while self.running:
+            self._control_step()
+            utime.sleep_ms(self.temp_monitor.controller.period_ms)
+    
+    def _control_step(self):
+        """Tick the controller, turning the output off if that fails"""
+        try:
+            self.temp_monitor.update_output()
+        except Exception as e:
+            print(f"Error in control task: {e}")
+            # Never leave the Peltier latched on an unknown state
+            try:
+                self.temp_monitor.output_off()
+            except Exception as off_error:
+                print(f"Error turning the output off: {off_error}")
+        self._step("control")
+    
+    async def _http_task(self):
+        """Start/stop the web server with the WiFi link (clients are served by its own tasks)"""
+        while self.running:
+            try:
+                self.temp_monitor.manage_web_server()
+            except Exception as e:
+                print(f"Error in HTTP task: {e}")
+            self._step("http")
+            await asyncio.sleep(self.HTTP_PERIOD_MS / 1000)
+    
+    async def _wifi_task(self):
+        """Join, watch and rejoin the WiFi network without blocking the other tasks"""
+        while self.running:
+            try:
+                self.wifi.poll()
+            except Exception as e:
+                print(f"Error in WiFi task: {e}")
+            self._step("wifi")
+            await asyncio.sleep(self.WIFI_PERIOD_MS / 1000)
+    
+    async def _render_task(self):
+        """Refresh time-driven screen content and flush the LCD framebuffer"""
+        while self.running:
+            try:
+                self.gui.render()
+                self.gui.lcd.flush()
+            except Exception as e:
+                # E.g. an I2C error; the next pass redraws what changed
+                print(f"Error in render task: {e}")
+            self._step("render")
+            await asyncio.sleep(self.RENDER_PERIOD_MS / 1000)
+    
+    async def _input_task(self):
+        """Let the GUI handle button events, sleeping until the next edge or timed event"""
+        self.gui.enter()
+        buttons = self.gui.buttons
+        flag = None
+        if hasattr(asyncio, 'ThreadSafeFlag'):
+            # Set by the button interrupts
+            flag = asyncio.ThreadSafeFlag()
+            buttons.flag = flag
+        while self.running:
+            try:
+                self.gui.tick()
+            except Exception as e:
+                print(f"Error in input task: {e}")
+            self._step("input")
+            
+            due = buttons.ms_until_due()
+            if flag is None:
+                # No interrupt wakeup: poll
+                await asyncio.sleep(self.INPUT_PERIOD_MS / 1000)
+                continue
+            try:
+                await asyncio.wait_for(flag.wait(), (self.INPUT_IDLE_MS if due is None else due) / 1000)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,88 @@
+import _thread
+from sim.clock import SimClock
+from sim.thermal import FreezerModel
+from sim.hd44780 import HD44780
+
+class Board:
+    """State of the simulated PicoFreezer board shared by the fake modules.
+
+    The fake machine, onewire, ds18x20 and network modules look up the
+    board through get_board(), so a test or launcher can configure it
+    (clock speed, thermal model, networks) before main.py is imported.
+    """
+
+    def __init__(self, clock=None, model=None, output_pin=16, lcd_addr=39,
+                 lcd_rows=2, lcd_cols=16):
+        """Initialize the board
+
+        Args:
+            clock (SimClock): Simulated clock (default: real time)
+            model (FreezerModel): Thermal model driven by the output pin
+            output_pin (int): GPIO driving the Peltier
+            lcd_addr (int): I2C address of the LCD backpack
+        """
+        self.clock = clock if clock is not None else SimClock()
+        self.model = model if model is not None else FreezerModel()
+        self.output_pin = output_pin
+        # Sensing and control may run on different threads
+        self.lock = _thread.allocate_lock()
+
+        # Pin objects by GPIO number (last one created wins)
+        self.pins = {}
+        # I2C devices by address
+        self.i2c_devices = {lcd_addr: HD44780(lcd_rows, lcd_cols)}
+
+        # 1-Wire probes: ROM -> function returning the temperature (C)
+        self.probes = {
+            bytes(b'\x28\xff\x64\x1f\x6b\x16\x04\x5c'): self.model.read_probe,
+            bytes(b'\x28\xff\x8a\x2e\x6b\x16\x04\x31'): self._read_hot_side,
+        }
+
+        # Visible WiFi networks: ssid -> (password, rssi)
+        self.networks = {"PicoFreezerSim": ("freezer123", -55), "Neighbour": ("secret", -80)}
+        # Simulated seconds a WLAN connect takes
+        self.connect_delay = 2.0
+        # SSID a new WLAN interface is already joined to (None: not joined)
+        self.joined_ssid = None
+
+    @property
+    def lcd(self):
+        """The LCD controller on the default address"""
+        for device in self.i2c_devices.values():
+            if isinstance(device, HD44780):
+                return device
+        return None
+
+    def _read_hot_side(self, resolution=12):
+        """Read the hot side probe quantised like a DS18B20"""
+        steps = 1 << (resolution - 8)
+        return round(self.model.hot_side() * steps) / steps
+
+    def update(self):
+        """Bring the thermal model up to the current simulated time"""
+        with self.lock:
+            self.model.advance_to(self.clock.now())
+
+    def set_output(self, level):
+        """Set the Peltier output level (0..1) from now on"""
+        with self.lock:
+            self.model.advance_to(self.clock.now())
+            self.model.output = level
+
+    def press(self, pin, pressed=True):
+        """Press (or release) an active-low button"""
+        self.pins[pin].set_input(0 if pressed else 1)
+
+_board = None
+
+def get_board():
+    """Get the board, creating a default one on first use"""
+    global _board
+    if _board is None:
+        _board = Board()
+    return _board
+
+def set_board(board):
+    """Replace the board used by the fake modules"""
+    global _board
+    _board = board
@@ -0,0 +1,108 @@
+"""Boot the unchanged PicoFreezer firmware on the host against simulated hardware.
+
+Run from src/:  python -m sim.boot --speed 60
+The web interface is served on http://127.0.0.1:8080 once the simulated
+WiFi is joined (network "PicoFreezerSim", password "freezer123", or start
+with --wifi).
+"""
+import _thread
+import os
+import sys
+
+from sim.board import Board, set_board
+from sim.clock import SimClock
+from sim.thermal import FreezerModel
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKES_DIR = os.path.join(SRC_DIR, 'sim', 'fakes')
+
+def install(board=None, port=8080):
+    """Put the fake hardware modules in place of the MicroPython ones
+
+    Args:
+        board (Board): Simulated board (default: real-time clock, default model)
+        port (int): Port the web server listens on
+    Returns:
+        Board: The installed board
+    """
+    if board is None:
+        board = Board()
+    set_board(board)
+    board.clock.install()
+
+    for path in (FAKES_DIR, os.path.join(SRC_DIR, 'lib'), SRC_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    # asyncio timers run on the host clock; scale the sleeps to the sim clock
+    import asyncio
+    host_sleep = getattr(asyncio.sleep, 'host_sleep', asyncio.sleep)
+    clock = board.clock
+
+    async def sleep(delay, result=None):
+        return await host_sleep(delay / clock.speed, result)
+
+    sleep.host_sleep = host_sleep
+    asyncio.sleep = sleep
+
+    from web.server import WebServer
+    WebServer.PORT = port
+    WebServer.WEB_ROOT = os.path.join(SRC_DIR, 'web')
+    return board
+
+def _show_lcd(lcd, interval=0.2):
+    """Print the LCD contents whenever they change (polled in real time)"""
+    from sim.clock import _sleep
+    shown = None
+    while True:
+        text = lcd.text()
+        if text != shown:
+            shown = text
+            print(f"+{'-' * lcd.num_cols}+")
+            for line in text.split('\n'):
+                print(f"|{line}|")
+            print(f"+{'-' * lcd.num_cols}+")
+        _sleep(interval)
+
+def main():
+    """Parse the command line, install the simulated board and run main.py"""
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='simulated seconds per real second')
+    parser.add_argument('--ambient', type=float, default=25.0, help='room temperature (C)')
+    parser.add_argument('--initial', type=float, default=None,
+                        help='starting freezer temperature (C, default ambient)')
+    parser.add_argument('--door-every', type=float, default=0,
+                        help='open the door once every N simulated seconds')
+    parser.add_argument('--door-open', type=float, default=30,
+                        help='how long each door opening lasts (s)')
+    parser.add_argument('--ticks-start', type=int, default=0,
+                        help='initial ticks_ms() value, e.g. to cross the wrap early')
+    parser.add_argument('--port', type=int, default=8080, help='web server port')
+    parser.add_argument('--data-dir', default='/tmp/picofreezer-sim',
+                        help='directory standing in for the flash filesystem')
+    parser.add_argument('--wifi', action='store_true',
+                        help='start already joined to the simulated network (serves the web UI)')
+    parser.add_argument('--show-lcd', action='store_true', help='print the LCD when it changes')
+    args = parser.parse_args()
+
+    model = FreezerModel(ambient=args.ambient, initial=args.initial)
+    if args.door_every:
+        model.open_door_every(args.door_every, args.door_open)
+    board = Board(clock=SimClock(speed=args.speed, start_ticks=args.ticks_start), model=model)
+    if args.wifi:
+        board.joined_ssid = next(iter(board.networks))
+    install(board, port=args.port)
+
+    if args.show_lcd:
+        _thread.start_new_thread(_show_lcd, (board.lcd,))
+
+    os.makedirs(os.path.join(args.data_dir, 'storage'), exist_ok=True)
+    os.chdir(args.data_dir)
+
+    import main as firmware
+    firmware.main()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import time
+
+# Host clock, captured before install() replaces the time module functions
+_monotonic = time.monotonic
+_sleep = time.sleep
+_wall = time.time
+
+# MicroPython ticks wrap at 2**30 on the RP2040
+TICKS_PERIOD = 1 << 30
+TICKS_MASK = TICKS_PERIOD - 1
+TICKS_HALF = TICKS_PERIOD // 2
+
+class SimClock:
+    """Simulated clock running a fixed factor faster than real time.
+
+    Simulated seconds advance speed times faster than host seconds and
+    every sleep is shortened by the same factor, so code written against
+    utime behaves as on the device, only sooner. Ticks wrap like
+    MicroPython's, and start_ticks can place the wrap inside a test run.
+    """
+
+    def __init__(self, speed=1.0, start_time=None, start_ticks=0):
+        """Initialize the clock
+
+        Args:
+            speed (float): Simulated seconds per host second
+            start_time (int): utime.time() at start (default: host wall clock)
+            start_ticks (int): ticks_ms() at start
+        """
+        self.speed = speed
+        self.start_time = int(_wall()) if start_time is None else start_time
+        self.start_ticks = start_ticks
+        self._host_start = _monotonic()
+        # Simulated seconds not covered by the host clock (advance(), set_speed())
+        self._skipped = 0.0
+
+    def now(self):
+        """Get simulated seconds since the clock started"""
+        return (_monotonic() - self._host_start) * self.speed + self._skipped
+
+    def set_speed(self, speed):
+        """Change the speed without a jump in simulated time"""
+        self._skipped = self.now()
+        self._host_start = _monotonic()
+        self.speed = speed
+
+    def advance(self, seconds):
+        """Jump simulated time forward without waiting"""
+        self._skipped += seconds
+
+    def time(self):
+        """utime.time(): integer seconds since the epoch"""
+        return self.start_time + int(self.now())
+
+    def ticks_ms(self):
+        """utime.ticks_ms()"""
+        return (self.start_ticks + int(self.now() * 1000)) & TICKS_MASK
+
+    def ticks_us(self):
+        """utime.ticks_us()"""
+        return (self.start_ticks * 1000 + int(self.now() * 1000000)) & TICKS_MASK
+
+    def ticks_add(self, ticks, delta):
+        """utime.ticks_add()"""
+        return (ticks + delta) & TICKS_MASK
+
+    def ticks_diff(self, end, start):
+        """utime.ticks_diff(): signed difference, correct across the wrap"""
+        return ((end - start + TICKS_HALF) & TICKS_MASK) - TICKS_HALF
+
+    def sleep(self, seconds):
+        """utime.sleep()"""
+        if seconds > 0:
+            _sleep(seconds / self.speed)
+
+    def sleep_ms(self, ms):
+        """utime.sleep_ms()"""
+        self.sleep(ms / 1000)
+
+    def sleep_us(self, us):
+        """utime.sleep_us()"""
+        self.sleep(us / 1000000)
+
+    def install(self):
+        """Make the time module behave like MicroPython's utime on this clock
+
+        The functions are replaced in place, so modules that already did
+        "import time" see them too. utime becomes an alias of time.
+        """
+        import sys
+        time.time = self.time
+        time.sleep = self.sleep
+        time.sleep_ms = self.sleep_ms
+        time.sleep_us = self.sleep_us
+        time.ticks_ms = self.ticks_ms
+        time.ticks_us = self.ticks_us
+        time.ticks_add = self.ticks_add
+        time.ticks_diff = self.ticks_diff
+        sys.modules['utime'] = time
@@ -0,0 +1,40 @@
+"""Fake of MicroPython's ds18x20 driver reading the simulated probes."""
+from sim.board import get_board
+
+class DS18X20:
+    """DS18B20 probes answering with the thermal model's temperatures"""
+
+    # Power-on scratchpad: TH, TL, config (12-bit)
+    DEFAULT_SCRATCH = (0x4b, 0x46, 0x7f)
+
+    def __init__(self, onewire):
+        """Initialize the driver on a 1-Wire bus"""
+        self.ow = onewire
+        self.config = {}
+
+    def scan(self):
+        """List the ROMs of the probes on the bus"""
+        return [bytearray(rom) for rom in get_board().probes]
+
+    def convert_temp(self):
+        """Start a conversion on every probe (readings are taken when read)"""
+        get_board().update()
+
+    def read_scratch(self, rom):
+        """Read the 9 byte scratchpad (temperature bytes are not filled in)"""
+        th, tl, config = self.config.get(bytes(rom), self.DEFAULT_SCRATCH)
+        return bytearray([0x50, 0x05, th, tl, config, 0xff, 0x0c, 0x10, 0x00])
+
+    def write_scratch(self, rom, buf):
+        """Write TH, TL and the configuration register"""
+        self.config[bytes(rom)] = (buf[0], buf[1], buf[2])
+
+    def read_temp(self, rom):
+        """Read the last conversion in Celsius at the configured resolution"""
+        board = get_board()
+        read = board.probes.get(bytes(rom))
+        if read is None:
+            raise OSError("no such device")
+        board.update()
+        config = self.config.get(bytes(rom), self.DEFAULT_SCRATCH)[2]
+        return read(9 + ((config >> 5) & 0x3))
@@ -0,0 +1,118 @@
+"""Fake of MicroPython's machine module backed by the simulated board."""
+from sim.board import get_board
+
+def freq(hz=None):
+    """Get the CPU frequency (RP2040 default)"""
+    return 125000000
+
+def reset():
+    """Resetting the board ends the simulation"""
+    raise SystemExit("machine.reset()")
+
+class Pin:
+    """GPIO pin; outputs on the board's output pin drive the thermal model"""
+
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=IN, pull=None, value=None):
+        """Initialize the pin (inputs with a pull-up read 1)"""
+        self.id = id
+        self.mode = mode
+        self.pull = pull
+        self._value = 1 if pull == self.PULL_UP else 0
+        self._handler = None
+        self._trigger = 0
+        get_board().pins[id] = self
+        if value is not None:
+            self.value(value)
+
+    def value(self, value=None):
+        """Read the pin, or drive it when a value is given"""
+        if value is None:
+            return self._value
+        self._value = 1 if value else 0
+        board = get_board()
+        if self.id == board.output_pin and self.mode == self.OUT:
+            board.set_output(float(self._value))
+
+    def on(self):
+        """Drive the pin high"""
+        self.value(1)
+
+    def off(self):
+        """Drive the pin low"""
+        self.value(0)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        """Register an edge interrupt handler"""
+        self._handler = handler
+        self._trigger = trigger
+
+    def set_input(self, level):
+        """Change the level seen on an input pin (board side), firing IRQs"""
+        level = 1 if level else 0
+        if level == self._value:
+            return
+        self._value = level
+        edge = self.IRQ_RISING if level else self.IRQ_FALLING
+        if self._handler is not None and self._trigger & edge:
+            self._handler(self)
+
+    def __repr__(self):
+        return f"Pin({self.id})"
+
+class PWM:
+    """PWM slice; the duty cycle on the board's output pin is the output level"""
+
+    def __init__(self, pin, freq=None, duty_u16=None):
+        """Initialize PWM on a Pin"""
+        self.pin = pin
+        self._freq = freq or 1000
+        self._duty = 0
+        if duty_u16 is not None:
+            self.duty_u16(duty_u16)
+
+    def freq(self, value=None):
+        """Get or set the frequency (Hz)"""
+        if value is None:
+            return self._freq
+        self._freq = value
+
+    def duty_u16(self, value=None):
+        """Get or set the duty cycle (0-65535)"""
+        if value is None:
+            return self._duty
+        self._duty = value
+        board = get_board()
+        if self.pin.id == board.output_pin:
+            board.set_output(value / 65535)
+
+    def deinit(self):
+        """Stop the PWM output"""
+        self.duty_u16(0)
+
+class I2C:
+    """I2C bus forwarding writes to the board's devices"""
+
+    def __init__(self, id, sda=None, scl=None, freq=400000):
+        """Initialize the bus"""
+        self.id = id
+        self.freq = freq
+
+    def scan(self):
+        """List the addresses of the attached devices"""
+        return sorted(get_board().i2c_devices)
+
+    def writeto(self, addr, buf, stop=True):
+        """Write to a device; raises OSError (ENODEV) if nothing answers"""
+        device = get_board().i2c_devices.get(addr)
+        if device is None:
+            raise OSError(19)
+        device.write(bytes(buf))
+        return len(buf)
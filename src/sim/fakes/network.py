@@ -0,0 +1,89 @@
+"""Fake of MicroPython's network module with the board's WiFi networks."""
+from sim.board import get_board
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_WRONG_PASSWORD = -3
+STAT_NO_AP_FOUND = -2
+STAT_CONNECT_FAIL = -1
+STAT_GOT_IP = 3
+
+class WLAN:
+    """Station interface joining the simulated networks after a delay"""
+
+    def __init__(self, interface=STA_IF):
+        """Initialize the interface (inactive)"""
+        self.interface = interface
+        self._active = False
+        self._status = STAT_IDLE
+        self._ssid = None
+        self._connect_at = None
+        joined = get_board().joined_ssid
+        if joined is not None:
+            self._status = STAT_GOT_IP
+            self._ssid = joined
+
+    def active(self, value=None):
+        """Get or set whether the interface is up"""
+        if value is None:
+            return self._active
+        self._active = bool(value)
+        if not self._active:
+            self.disconnect()
+
+    def scan(self):
+        """List visible networks as (ssid, bssid, channel, rssi, security, hidden)"""
+        results = []
+        for i, (ssid, (password, rssi)) in enumerate(get_board().networks.items()):
+            security = 3 if password else 0
+            results.append((ssid.encode(), bytes([2, 0, 0, 0, 0, i]), 1 + i % 11,
+                            rssi, security, 0))
+        return results
+
+    def connect(self, ssid, password=None):
+        """Start joining a network; status() reports the outcome later"""
+        board = get_board()
+        network = board.networks.get(ssid)
+        self._ssid = ssid
+        if network is None:
+            self._status = STAT_NO_AP_FOUND
+        elif network[0] and network[0] != password:
+            self._status = STAT_WRONG_PASSWORD
+        else:
+            self._status = STAT_CONNECTING
+            self._connect_at = board.clock.now() + board.connect_delay
+
+    def status(self, param=None):
+        """Get the link status (or the RSSI with status('rssi'))"""
+        if (self._status == STAT_CONNECTING and
+                get_board().clock.now() >= self._connect_at):
+            self._status = STAT_GOT_IP
+        if param == 'rssi':
+            return get_board().networks.get(self._ssid, (None, 0))[1]
+        return self._status
+
+    def isconnected(self):
+        """Check whether the interface has an IP address"""
+        return self.status() == STAT_GOT_IP
+
+    def disconnect(self):
+        """Leave the current network"""
+        self._status = STAT_IDLE
+        self._ssid = None
+
+    def ifconfig(self):
+        """Get (ip, netmask, gateway, dns); the simulator serves on localhost"""
+        if self.isconnected():
+            return ('127.0.0.1', '255.0.0.0', '127.0.0.1', '127.0.0.1')
+        return ('0.0.0.0', '0.0.0.0', '0.0.0.0', '0.0.0.0')
+
+    def config(self, *args, **kwargs):
+        """Get interface parameters (only 'essid' and 'mac')"""
+        if args and args[0] == 'essid':
+            return self._ssid
+        if args and args[0] == 'mac':
+            return b'\x28\xcd\xc1\x00\x00\x01'
+        return None
@@ -0,0 +1,15 @@
+"""Fake of MicroPython's onewire module."""
+
+class OneWireError(Exception):
+    pass
+
+class OneWire:
+    """1-Wire bus on a pin; the probes live on the simulated board"""
+
+    def __init__(self, pin):
+        """Initialize the bus"""
+        self.pin = pin
+
+    def reset(self, required=False):
+        """Reset the bus; True if a device answered"""
+        return True
@@ -0,0 +1,195 @@
+"""Host fuzzer for the in-place HTTP request parser (web.http).
+
+Valid requests with random methods, paths, queries, header casing and
+bodies are split into random segments (sometimes pipelined) and must
+parse back to what was sent. Mutated requests (flipped, inserted and
+dropped bytes, truncation) must either parse with every offset inside
+the buffer or be rejected with ValueError; any other exception is a bug.
+
+Run from src/:  python3 -m sim.fuzz_http --iterations 20000
+"""
+import argparse
+import asyncio
+import random
+import sys
+
+from web.http import RequestParser, CONTENT_LENGTH, CONNECTION, IF_NONE_MATCH
+
+MAX_HEADER_BYTES = 512
+MAX_BODY_BYTES = 256
+
+class SegmentReader:
+    """Stream returning pre-cut segments, then end of stream"""
+
+    def __init__(self, segments):
+        self.segments = list(segments)
+
+    async def read(self, size):
+        if not self.segments:
+            return b''
+        segment = self.segments.pop(0)
+        if len(segment) > size:
+            self.segments.insert(0, segment[size:])
+            segment = segment[:size]
+        return segment
+
+class ReadIntoReader(SegmentReader):
+    """Same, through the MicroPython-style readinto()"""
+
+    async def readinto(self, buffer):
+        data = await self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+def _token(rng, alphabet, low, high):
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+
+def _random_case(rng, name):
+    return ''.join(c.upper() if rng.random() < 0.5 else c for c in name)
+
+def make_request(rng):
+    """Build a random valid request
+    Returns:
+        tuple: (raw bytes, expected fields)
+    """
+    method = rng.choice(['GET', 'POST', 'PUT', 'DELETE', 'HEAD'])
+    path = '/' + _token(rng, 'abcdefghijklmnopqrstuvwxyz0123456789/._-', 0, 30)
+    query = _token(rng, 'abcdef0123456789=&%', 0, 20) if rng.random() < 0.5 else ''
+    version = rng.choice(['1.0', '1.1'])
+    body = _token(rng, 'abcdefghij=&-.0123456789', 0, MAX_BODY_BYTES).encode()
+
+    headers = []
+    expected_connection = None
+    if rng.random() < 0.5:
+        expected_connection = rng.choice(['close', 'keep-alive', 'Upgrade'])
+        headers.append(('connection', expected_connection))
+    etag = None
+    if rng.random() < 0.3:
+        etag = '"' + _token(rng, '0123456789abcdef', 1, 16) + '"'
+        headers.append(('if-none-match', etag))
+    if body or rng.random() < 0.3:
+        headers.append(('content-length', str(len(body))))
+    for _ in range(rng.randint(0, 4)):
+        headers.append(('x-' + _token(rng, 'abcdefgh', 1, 8), _token(rng, 'abc 123;=', 0, 20)))
+    rng.shuffle(headers)
+
+    newline = '\r\n' if rng.random() < 0.9 else '\n'
+    lines = [f"{method} {path}{'?' + query if query else ''} HTTP/{version}"]
+    for name, value in headers:
+        spaces = ' ' * rng.randint(0, 2)
+        lines.append(f"{_random_case(rng, name)}:{spaces}{value}{' ' * rng.randint(0, 1)}")
+    raw = (newline.join(lines) + newline + newline).encode() + body
+
+    keep_alive = (expected_connection == 'keep-alive' if version == '1.0'
+                  else expected_connection != 'close')
+    return raw, {
+        'key': f"{method} {path}".encode(),
+        'query': query,
+        'body': body,
+        'keep_alive': keep_alive,
+        'etag': etag,
+    }
+
+def split(rng, raw):
+    """Cut bytes into random segments"""
+    segments = []
+    while raw:
+        size = rng.randint(1, max(1, len(raw) if rng.random() < 0.3 else 16))
+        segments.append(raw[:size])
+        raw = raw[size:]
+    return segments
+
+def mutate(rng, raw):
+    """Damage a request"""
+    data = bytearray(raw)
+    for _ in range(rng.randint(1, 4)):
+        choice = rng.random()
+        if choice < 0.3 and data:
+            data[rng.randrange(len(data))] = rng.randrange(256)
+        elif choice < 0.5:
+            data.insert(rng.randint(0, len(data)), rng.choice(b' :\r\n?0123456789'))
+        elif choice < 0.7 and data:
+            del data[rng.randrange(len(data))]
+        elif choice < 0.85:
+            data = data[:rng.randint(0, len(data))]
+        else:
+            data += bytes(rng.randrange(256) for _ in range(rng.randint(1, 600)))
+    return bytes(data)
+
+def _check_bounds(parser):
+    """Every recorded offset must lie inside the received bytes"""
+    assert 0 <= parser.request_start < parser.method_end < parser.path_end <= parser.target_end
+    assert parser.body_start <= parser.request_end <= parser.end <= len(parser.buffer)
+    for i in range(0, len(parser.headers), 2):
+        if parser.headers[i] >= 0:
+            assert parser.headers[i] <= parser.headers[i + 1] <= parser.body_start
+
+async def check_valid(rng, parser):
+    """Parse one to three pipelined valid requests"""
+    requests = [make_request(rng) for _ in range(rng.randint(1, 3))]
+    raw = b''.join(request for request, _ in requests)
+    reader_class = rng.choice([SegmentReader, ReadIntoReader])
+    reader = reader_class(split(rng, raw))
+    for sent, expected in requests:
+        assert await parser.read(reader, 1, 1), sent
+        _check_bounds(parser)
+        assert parser.route_key() == expected['key'], (sent, parser.route_key())
+        assert parser.query() == expected['query'], sent
+        assert bytes(parser.body()) == expected['body'], sent
+        assert parser.keep_alive() == expected['keep_alive'], sent
+        etag = parser.header(IF_NONE_MATCH)
+        assert (None if etag is None else str(etag, 'utf-8')) == expected['etag'], sent
+        assert parser.content_length == len(expected['body'])
+    assert not await parser.read(reader, 1, 1)
+
+async def check_mutated(rng, parser):
+    """Parse a damaged request: a result with sane offsets or ValueError"""
+    raw, _ = make_request(rng)
+    reader = rng.choice([SegmentReader, ReadIntoReader])(split(rng, mutate(rng, raw)))
+    while True:
+        try:
+            if not await parser.read(reader, 1, 1):
+                return
+        except ValueError:
+            return
+        _check_bounds(parser)
+        parser.route_key()
+        parser.query() if rng.random() < 0.5 else None
+        parser.keep_alive()
+        parser.header(CONNECTION)
+        parser.header(CONTENT_LENGTH)
+
+async def fuzz(iterations, seed):
+    """Run the fuzzer
+    Returns:
+        int: Failures
+    """
+    rng = random.Random(seed)
+    failures = 0
+    for iteration in range(iterations):
+        parser = RequestParser(MAX_HEADER_BYTES, MAX_BODY_BYTES)
+        check = check_valid if iteration % 2 == 0 else check_mutated
+        try:
+            await check(rng, parser)
+        except UnicodeDecodeError:
+            # Query strings are decoded on request; invalid UTF-8 is the handler's problem
+            pass
+        except Exception as e:
+            failures += 1
+            print(f"iteration {iteration} ({check.__name__}): {type(e).__name__}: {e!r}"[:300])
+            if failures >= 10:
+                break
+    return failures
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    failures = asyncio.run(fuzz(args.iterations, args.seed))
+    print(f"{args.iterations} iterations, {failures} failures")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
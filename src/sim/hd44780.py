@@ -0,0 +1,93 @@
+class HD44780:
+    """HD44780 LCD behind a PCF8574 backpack, decoded from its I2C writes.
+
+    Nibbles are latched on the falling edge of E. The controller starts in
+    8-bit mode and switches to 4-bit pairs once a 4-bit function set is seen,
+    as in the real initialization sequence. Only DDRAM is modelled.
+    """
+
+    MASK_RS = 0x01
+    MASK_E = 0x04
+    MASK_BACKLIGHT = 0x08
+
+    def __init__(self, num_rows=2, num_cols=16):
+        """Initialize a blank display"""
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.ddram = bytearray(b' ' * 128)
+        self.address = 0
+        self.cgram_mode = False
+        self.four_bit = False
+        self.backlight = False
+        self._last = 0
+        self._high = None
+
+        # Bus statistics
+        self.transactions = 0
+        self.bytes_written = 0
+        # Called with no arguments after every write that changed DDRAM
+        self.on_change = None
+
+    def write(self, buf):
+        """Handle one I2C write of PCF8574 port states"""
+        self.transactions += 1
+        self.bytes_written += len(buf)
+        changed = False
+        for value in buf:
+            self.backlight = bool(value & self.MASK_BACKLIGHT)
+            if self._last & self.MASK_E and not value & self.MASK_E:
+                changed |= self._latch(value >> 4, value & self.MASK_RS)
+            self._last = value
+        if changed and self.on_change is not None:
+            self.on_change()
+
+    def _latch(self, nibble, rs):
+        """Latch one nibble; returns True if DDRAM changed"""
+        if not self.four_bit:
+            # 8-bit mode: only the high nibble is wired
+            if nibble == 0x2:
+                self.four_bit = True
+            return False
+        if self._high is None:
+            self._high = nibble
+            return False
+        byte = (self._high << 4) | nibble
+        self._high = None
+        if rs:
+            return self._data(byte)
+        self._command(byte)
+        return False
+
+    def _command(self, cmd):
+        """Execute an instruction"""
+        if cmd == 0x01:
+            for i in range(len(self.ddram)):
+                self.ddram[i] = 0x20
+            self.address = 0
+            self.cgram_mode = False
+        elif cmd & 0xfe == 0x02:
+            self.address = 0
+            self.cgram_mode = False
+        elif cmd & 0x80:
+            self.address = cmd & 0x7f
+            self.cgram_mode = False
+        elif cmd & 0x40:
+            self.cgram_mode = True
+
+    def _data(self, byte):
+        """Write a data byte at the address counter"""
+        if self.cgram_mode:
+            return False
+        changed = self.ddram[self.address] != byte
+        self.ddram[self.address] = byte
+        self.address = (self.address + 1) & 0x7f
+        return changed
+
+    def line(self, row):
+        """Get the text shown on a row"""
+        start = (0x40 if row & 1 else 0) + (self.num_cols if row & 2 else 0)
+        return bytes(self.ddram[start:start + self.num_cols]).decode('latin-1')
+
+    def text(self):
+        """Get every row of the display joined by newlines"""
+        return '\n'.join(self.line(row) for row in range(self.num_rows))
@@ -0,0 +1,91 @@
+class FreezerModel:
+    """First-order thermal model of a Peltier-cooled freezer.
+
+    The air temperature T follows
+
+        dT/dt = (ambient - T) / tau - pull_rate * output
+
+    where 1/tau grows by 1/door_tau while the door is open. The cold probe
+    lags the air with its own time constant, which is what makes on/off
+    control overshoot, and the hot-side probe rises with the output level.
+    """
+
+    def __init__(self, ambient=25.0, tau=3000.0, pull_rate=0.01, probe_tau=30.0,
+                 door_tau=120.0, hot_rise=15.0, power_w=60.0, initial=None):
+        """Initialize the model (at ambient temperature by default)
+
+        Args:
+            ambient (float): Room temperature (C)
+            tau (float): Insulation time constant (s)
+            pull_rate (float): Cooling rate at full output (C/s)
+            probe_tau (float): Cold probe lag time constant (s)
+            door_tau (float): Extra leak time constant while the door is open (s)
+            hot_rise (float): Hot side temperature above ambient at full output (C)
+            power_w (float): Electrical power at full output (W)
+            initial (float): Starting air temperature (C)
+        """
+        self.ambient = ambient
+        self.tau = tau
+        self.pull_rate = pull_rate
+        self.probe_tau = probe_tau
+        self.door_tau = door_tau
+        self.hot_rise = hot_rise
+        self.power_w = power_w
+
+        self.temp = ambient if initial is None else initial
+        self.probe_temp = self.temp
+        self.output = 0.0
+        # Simulated seconds integrated so far
+        self.time = 0.0
+        self.energy_j = 0.0
+
+        # Door openings as (start, duration) in model seconds
+        self.door_events = []
+        # Periodic door openings (every period seconds for duration seconds)
+        self.door_period = 0
+        self.door_duration = 0
+
+    def open_door(self, start, duration):
+        """Schedule a door opening"""
+        self.door_events.append((start, duration))
+
+    def open_door_every(self, period, duration):
+        """Open the door for duration seconds once every period seconds"""
+        self.door_period = period
+        self.door_duration = duration
+
+    def door_open(self, t=None):
+        """Check whether the door is open at model time t (default: now)"""
+        if t is None:
+            t = self.time
+        if self.door_period and t % self.door_period < self.door_duration:
+            return True
+        for start, duration in self.door_events:
+            if start <= t < start + duration:
+                return True
+        return False
+
+    def step(self, output, dt):
+        """Advance the model by dt seconds with the given output level (0..1)"""
+        self.output = output
+        leak = 1 / self.tau
+        if self.door_open():
+            leak += 1 / self.door_tau
+        self.temp += ((self.ambient - self.temp) * leak - self.pull_rate * output) * dt
+        self.probe_temp += (self.temp - self.probe_temp) / self.probe_tau * dt
+        self.energy_j += self.power_w * output * dt
+        self.time += dt
+
+    def advance_to(self, t, max_step=1.0):
+        """Integrate at the current output level up to model time t"""
+        while self.time < t:
+            self.step(self.output, min(max_step, t - self.time))
+
+    def read_probe(self, resolution=12):
+        """Read the cold probe quantised like a DS18B20 at the given resolution"""
+        steps = 1 << (resolution - 8)
+        return round(self.probe_temp * steps) / steps
+
+    def hot_side(self):
+        """Get the hot side heatsink temperature (C)"""
+        return self.ambient + self.hot_rise * self.output
@@ -0,0 +1,246 @@
+import os
+import struct
+
+class DataLogger:
+    """Append-only binary log of readings in rotating flash segment files.
+
+    Each record is fixed size: timestamp, target and output state followed
+    by one temperature per probe (centi-degrees, MISSING when unread).
+    Records collect in a RAM buffer and are written a page at a time.
+    Segments start with a header holding the record layout and the first
+    timestamp, so a time range is found by picking segments from their
+    headers and binary searching the fixed-size records inside them.
+    The oldest segment is deleted once the total size would exceed max_bytes.
+
+    Timestamps only increase within a segment. The clock restarts from the
+    RTC default at every power-up, so each boot starts a new segment, and so
+    does any reading older than the previous one. Segments are therefore
+    not ordered by time among themselves.
+    """
+
+    MAGIC = b'PFL1'
+    # magic, version, probe count, record size, first timestamp
+    HEADER_FORMAT = '<4sBBHl'
+    HEADER_SIZE = 12
+    VERSION = 1
+    # Stored for probes without a reading
+    MISSING = -32768
+
+    def __init__(self, probe_count=1, log_dir='storage/log', page_size=256,
+                 segment_bytes=32768, max_bytes=262144):
+        """Initialize the logger (the first flush starts a new segment)
+
+        Args:
+            probe_count (int): Temperatures per record
+            log_dir (str): Directory holding the segment files
+            page_size (int): Size of the RAM write buffer (bytes)
+            segment_bytes (int): Size at which a new segment is started
+            max_bytes (int): Cap on the total size of all segments
+        """
+        self.probe_count = probe_count
+        self.log_dir = log_dir
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+
+        # timestamp, target, output state, temperatures
+        self.record_format = '<lhB' + 'h' * probe_count
+        self.record_size = struct.calcsize(self.record_format)
+
+        self.buffer = bytearray(max(page_size, self.record_size))
+        self.buffered = 0
+        self._first_buffered_time = None
+        self._values = [0] * probe_count
+        # Timestamp of the last logged record
+        self.last_time = None
+
+        self._ensure_dir()
+        self.segments = self._list_segments()
+        # Never resume a segment: the clock may have gone back since it was written
+        self.current_segment = None
+        self.current_size = 0
+
+    def log(self, timestamp, temps, target, output_on):
+        """Add a record to the write buffer (flushed when a page is full)
+
+        Args:
+            timestamp (int): Seconds (utime.time())
+            temps (list): Temperature per probe in Celsius (None if unread)
+            target (float): Target temperature in Celsius
+            output_on (bool): Cooling output state
+        """
+        if self.last_time is not None and timestamp < self.last_time:
+            # Clock went back: keep every segment in time order
+            self.flush()
+            self.current_segment = None
+        elif self.buffered + self.record_size > len(self.buffer):
+            self.flush()
+        self.last_time = timestamp
+
+        values = self._values
+        for i in range(self.probe_count):
+            temp = temps[i] if i < len(temps) else None
+            values[i] = self.MISSING if temp is None else self._centi(temp)
+
+        struct.pack_into(self.record_format, self.buffer, self.buffered,
+                         timestamp, self._centi(target), 1 if output_on else 0, *values)
+        if self._first_buffered_time is None:
+            self._first_buffered_time = timestamp
+        self.buffered += self.record_size
+
+    def flush(self):
+        """Write the buffered records to the current segment"""
+        if not self.buffered:
+            return
+
+        if self.current_segment is None or self.current_size >= self.segment_bytes:
+            self._start_segment(self._first_buffered_time)
+
+        try:
+            with open(self._path(self.current_segment), 'ab') as f:
+                f.write(memoryview(self.buffer)[:self.buffered])
+            self.current_size += self.buffered
+        except OSError as e:
+            print(f"Error writing data log: {e}")
+        self.buffered = 0
+        self._first_buffered_time = None
+
+    def read_range(self, start, end):
+        """Iterate over logged records with start <= timestamp < end
+
+        Records come in log order, which is time order within a segment
+        but not across a clock reset.
+
+        Yields:
+            tuple: (timestamp, temps, target, output_on); temps/target in Celsius
+        """
+        for name in self.segments:
+            header = self._read_header(name)
+            # Segments are not ordered among themselves: check each one
+            if header is None or header[3] != self.record_size or header[4] >= end:
+                continue
+            for record in self._read_segment(name, start, end):
+                yield record
+
+        # Records still waiting in RAM
+        for offset in range(0, self.buffered, self.record_size):
+            record = self._unpack(self.buffer, offset)
+            if start <= record[0] < end:
+                yield record
+
+    def _read_segment(self, name, start, end):
+        """Seek to the first record at or after start and read until end"""
+        try:
+            f = open(self._path(name), 'rb')
+        except OSError:
+            return
+        with f:
+            count = (self._file_size(name) - self.HEADER_SIZE) // self.record_size
+            record = bytearray(self.record_size)
+
+            # Binary search on the fixed-size records
+            lo = 0
+            hi = count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                f.seek(self.HEADER_SIZE + mid * self.record_size)
+                f.readinto(record)
+                if struct.unpack_from('<l', record, 0)[0] < start:
+                    lo = mid + 1
+                else:
+                    hi = mid
+
+            f.seek(self.HEADER_SIZE + lo * self.record_size)
+            for _ in range(lo, count):
+                if f.readinto(record) != self.record_size:
+                    return
+                values = self._unpack(record, 0)
+                if values[0] >= end:
+                    return
+                yield values
+
+    def _unpack(self, buffer, offset):
+        """Decode one record into (timestamp, temps, target, output_on)"""
+        values = struct.unpack_from(self.record_format, buffer, offset)
+        temps = [None if v == self.MISSING else v / 100 for v in values[3:]]
+        return values[0], temps, values[1] / 100, bool(values[2])
+
+    def _centi(self, temp):
+        """Convert Celsius to clamped int16 centi-degrees"""
+        value = int(round(temp * 100))
+        if value > 32767:
+            return 32767
+        if value < -32767:
+            return -32767
+        return value
+
+    def _start_segment(self, first_time):
+        """Create the next segment file and rotate old ones out"""
+        number = 0
+        if self.segments:
+            number = int(self.segments[-1][4:9]) + 1
+        name = f'seg_{number:05d}.bin'
+        header = struct.pack(self.HEADER_FORMAT, self.MAGIC, self.VERSION,
+                             self.probe_count, self.record_size, first_time)
+        try:
+            with open(self._path(name), 'wb') as f:
+                f.write(header)
+        except OSError as e:
+            print(f"Error creating data log segment: {e}")
+        self.segments.append(name)
+        self.current_segment = name
+        self.current_size = self.HEADER_SIZE
+        self._rotate()
+
+    def _rotate(self):
+        """Delete the oldest segments until a full new segment fits under max_bytes"""
+        while len(self.segments) > 1:
+            total = 0
+            for name in self.segments[:-1]:
+                total += self._file_size(name)
+            if total + self.segment_bytes <= self.max_bytes:
+                return
+            oldest = self.segments.pop(0)
+            try:
+                os.remove(self._path(oldest))
+            except OSError as e:
+                print(f"Error removing data log segment: {e}")
+
+    def _read_header(self, name):
+        """Read a segment header as (magic, version, probes, record size, first time)"""
+        try:
+            with open(self._path(name), 'rb') as f:
+                data = f.read(self.HEADER_SIZE)
+        except OSError:
+            return None
+        if len(data) != self.HEADER_SIZE:
+            return None
+        header = struct.unpack(self.HEADER_FORMAT, data)
+        if header[0] != self.MAGIC or header[1] != self.VERSION:
+            return None
+        return header
+
+    def _list_segments(self):
+        """List segment file names, oldest first"""
+        names = [name for name in os.listdir(self.log_dir)
+                 if name.startswith('seg_') and name.endswith('.bin')]
+        names.sort()
+        return names
+
+    def _ensure_dir(self):
+        """Create the log directory if needed"""
+        try:
+            os.mkdir(self.log_dir)
+        except OSError:
+            # Already exists
+            pass
+
+    def _file_size(self, name):
+        """Get the size of a segment file (0 if missing)"""
+        try:
+            return os.stat(self._path(name))[6]
+        except OSError:
+            return 0
+
+    def _path(self, name):
+        """Get the path of a segment file"""
+        return f'{self.log_dir}/{name}'
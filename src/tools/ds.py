@@ -1,40 +1,182 @@
 import time
+import binascii
 from machine import Pin
 from onewire import OneWire
 from ds18x20 import DS18X20
+from tools import instrumentation
+
+READ_ERRORS = instrumentation.counter("sensor_read_errors_total", "Failed probe reads")
+CONVERSION_ERRORS = instrumentation.counter(
+    "sensor_conversion_errors_total", "Conversions that failed to start")
 
 class DS:
     """Handles DS18X20 temperature sensor operations."""
 
-    def __init__(self, data_pin=22):
-        """Initialize the DS18X20 temperature sensor"""
+    # Worst case conversion time (ms) for each resolution (bits)
+    CONVERSION_MS = {9: 94, 10: 188, 11: 375, 12: 750}
+    # Scratchpad configuration register value for each resolution
+    CONFIG_BYTES = {9: 0x1F, 10: 0x3F, 11: 0x5F, 12: 0x7F}
+    # DS18S20 family code; fixed 9-bit resolution, no configuration register
+    FAMILY_DS18S20 = 0x10
+
+    def __init__(self, data_pin=22, labels=None):
+        """Initialize the DS18X20 temperature sensor
+
+        Args:
+            data_pin (int): GPIO of the 1-Wire bus
+            labels (dict): Optional probe labels keyed by ROM ID (hex string)
+        """
         self.ds_pin = Pin(data_pin)
         self.ds_sensor = DS18X20(OneWire(self.ds_pin))
         self.roms = self.ds_sensor.scan()  # Scan for DS18X20 devices
+        self.rom_ids = [binascii.hexlify(rom).decode() for rom in self.roms]
+        self.labels = labels if labels is not None else {}
         
-    def get_temperature(self):
-        """Read temperature from the sensor
+        # Ticks deadline of the running conversion (None when idle)
+        self.conversion_deadline = None
+        # Last readings, one slot per ROM (same order as self.roms)
+        self.temps = [None] * len(self.roms)
+        self.latest_temp = None
+        
+        # Power-on default is 12-bit
+        self.resolution = 12
+        self.conversion_ms = self.CONVERSION_MS[12]
+    
+    def set_resolution(self, bits):
+        """Set the conversion resolution of every configurable probe
+        Args:
+            bits (int): 9, 10, 11 or 12
         Returns:
-            float: Temperature in Celsius or None if no sensor found
+            bool: True if every probe accepted the setting
+        """
+        if bits not in self.CONFIG_BYTES:
+            raise ValueError(f"Unsupported resolution: {bits}")
+        
+        success = True
+        for rom in self.roms:
+            if rom[0] == self.FAMILY_DS18S20:
+                continue
+            try:
+                # Keep the alarm registers (TH, TL), replace the config byte
+                scratch = self.ds_sensor.read_scratch(rom)
+                self.ds_sensor.write_scratch(rom, bytearray([
+                    scratch[2], scratch[3], self.CONFIG_BYTES[bits]
+                ]))
+            except Exception as e:
+                print(f"Error setting resolution: {e}")
+                success = False
+        
+        self.resolution = bits
+        # A probe that missed the update may still convert at 12-bit
+        self.conversion_ms = self.CONVERSION_MS[bits if success else 12]
+        return success
+        
+    def start_conversion(self):
+        """Start a temperature conversion without waiting for it
+        Returns:
+            bool: True if a conversion was started
         """
         if not self.roms:
-            return None
+            return False
         
         try:
-            # Start temperature conversion
             self.ds_sensor.convert_temp()
-            # Wait for conversion to complete (required by DS18X20 protocol)
-            time.sleep_ms(750)
-            
-            # Read the temperature from the first sensor found
-            temperature = self.ds_sensor.read_temp(self.roms[0])
-            
-            # Round to 1 decimal place
-            return round(temperature, 1)
         except Exception as e:
-            print(f"Error reading temperature: {e}")
+            print(f"Error starting conversion: {e}")
+            CONVERSION_ERRORS.inc()
+            self.conversion_deadline = None
+            return False
+        
+        self.conversion_deadline = time.ticks_add(time.ticks_ms(), self.conversion_ms)
+        return True
+    
+    def is_converting(self):
+        """Check if a conversion has been started and not yet collected"""
+        return self.conversion_deadline is not None
+    
+    def ready(self):
+        """Check if the running conversion has had time to complete"""
+        if self.conversion_deadline is None:
+            return False
+        return time.ticks_diff(time.ticks_ms(), self.conversion_deadline) >= 0
+    
+    def ms_until_ready(self):
+        """Get the milliseconds left until the running conversion completes"""
+        if self.conversion_deadline is None:
+            return 0
+        return max(0, time.ticks_diff(self.conversion_deadline, time.ticks_ms()))
+    
+    def poll(self):
+        """Collect the result of the running conversion if it is ready
+        Returns:
+            bool: True if the conversion finished (read_latest() is updated)
+        """
+        if not self.ready():
+            return False
+        
+        self.conversion_deadline = None
+        # One broadcast conversion covered every probe; read them all
+        for i in range(len(self.roms)):
+            try:
+                # Round to 1 decimal place
+                self.temps[i] = round(self.ds_sensor.read_temp(self.roms[i]), 1)
+            except Exception as e:
+                print(f"Error reading temperature from {self.rom_ids[i]}: {e}")
+                READ_ERRORS.inc()
+                self.temps[i] = None
+        
+        # The first sensor found is the primary (control) probe
+        self.latest_temp = self.temps[0]
+        return True
+    
+    def read_latest(self):
+        """Get the result of the last completed conversion
+        Returns:
+            float: Temperature in Celsius or None if the read failed
+        """
+        return self.latest_temp
+    
+    def read_all(self, by_label=False):
+        """Get the results of the last completed conversion for every probe
+        Args:
+            by_label (bool): Key by configured label (falls back to ROM ID)
+        Returns:
+            dict: Temperature in Celsius (or None) keyed by ROM ID or label
+        """
+        results = {}
+        for i in range(len(self.roms)):
+            key = self.rom_ids[i]
+            if by_label:
+                key = self.labels.get(key, key)
+            results[key] = self.temps[i]
+        return results
+    
+    def get_label(self, rom_id):
+        """Get the configured label of a probe (its ROM ID if unlabelled)"""
+        return self.labels.get(rom_id, rom_id)
+        
+    def get_temperature(self):
+        """Read temperature from the sensor (blocks for the conversion)
+        Returns:
+            float: Temperature in Celsius or None if no sensor found
+        """
+        if not self.start_conversion():
             return None
         
+        # Wait for conversion to complete (required by DS18X20 protocol)
+        time.sleep_ms(self.ms_until_ready())
+        while not self.poll():
+            time.sleep_ms(1)
+        return self.latest_temp
+        
+    def get_temperatures(self, by_label=False):
+        """Read every probe with a single conversion (blocks for the conversion)
+        Returns:
+            dict: Temperature in Celsius (or None) keyed by ROM ID or label
+        """
+        self.get_temperature()
+        return self.read_all(by_label)
+        
     def get_formatted_temp(self):
         """Get temperature as a formatted string
         Returns:
@@ -0,0 +1,169 @@
+import gc
+from array import array
+
+class Counter:
+    """Monotonic event counter."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        """Initialize the counter at zero"""
+        self.name = name
+        self.help = help_text
+        self.value = 0
+
+    def inc(self, amount=1):
+        """Add to the counter"""
+        self.value += amount
+
+    def render(self, out):
+        """Append the Prometheus text lines to out"""
+        out.append(f"# HELP {self.name} {self.help}\n# TYPE {self.name} {self.kind}\n"
+                   f"{self.name} {self.value}\n")
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value):
+        """Set the current value"""
+        self.value = value
+
+    def dec(self, amount=1):
+        """Subtract from the gauge"""
+        self.value -= amount
+
+class Histogram:
+    """Fixed-bucket histogram of integer observations (e.g. microseconds).
+
+    Bucket counts live in a preallocated array, so observe() allocates
+    nothing as long as the values stay small integers. The sum wraps
+    modulo 2**30 (about 18 minutes of microseconds) to stay a small
+    integer too; Prometheus reads the drop as a counter reset.
+    """
+
+    kind = "histogram"
+    # Largest MicroPython small integer; the sum never goes past it
+    SUM_MAX = 0x3FFFFFFF
+
+    def __init__(self, name, help_text, buckets):
+        """Initialize empty buckets
+
+        Args:
+            buckets (tuple): Ascending upper bounds; an overflow bucket is added
+        """
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.counts = array('L', [0] * (len(buckets) + 1))
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def observe(self, value):
+        """Record one observation"""
+        i = 0
+        buckets = self.buckets
+        n = len(buckets)
+        while i < n and value > buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        # Wrap without forming an intermediate value past SUM_MAX
+        headroom = self.SUM_MAX - self.sum
+        if value <= headroom:
+            self.sum += value
+        else:
+            self.sum = value - headroom - 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, fraction):
+        """Estimate a quantile as the upper bound of its bucket (max if in overflow)"""
+        if not self.count:
+            return 0
+        rank = fraction * self.count
+        seen = 0
+        for i in range(len(self.buckets)):
+            seen += self.counts[i]
+            if seen >= rank:
+                return min(self.buckets[i], self.max)
+        return self.max
+
+    def render(self, out):
+        """Append the Prometheus text lines to out (cumulative buckets)"""
+        name = self.name
+        out.append(f"# HELP {name} {self.help}\n# TYPE {name} histogram\n")
+        seen = 0
+        for i in range(len(self.buckets)):
+            seen += self.counts[i]
+            out.append(f'{name}_bucket{{le="{self.buckets[i]}"}} {seen}\n')
+        out.append(f'{name}_bucket{{le="+Inf"}} {self.count}\n'
+                   f"{name}_sum {self.sum}\n{name}_count {self.count}\n")
+
+# Default bucket bounds
+LATENCY_US = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000, 1000000)
+LATENCY_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Every metric created through this module, in creation order
+_metrics = []
+_by_name = {}
+
+def _register(metric):
+    """Add a metric to the registry (names are unique)"""
+    if metric.name in _by_name:
+        return _by_name[metric.name]
+    _metrics.append(metric)
+    _by_name[metric.name] = metric
+    return metric
+
+def counter(name, help_text):
+    """Create (or get) a registered Counter"""
+    return _register(Counter(name, help_text))
+
+def gauge(name, help_text):
+    """Create (or get) a registered Gauge"""
+    return _register(Gauge(name, help_text))
+
+def histogram(name, help_text, buckets=LATENCY_US):
+    """Create (or get) a registered Histogram"""
+    return _register(Histogram(name, help_text, buckets))
+
+def get(name):
+    """Get a registered metric by name (None if unknown)"""
+    return _by_name.get(name)
+
+MEM_FREE = gauge("gc_mem_free_bytes", "Free heap after the last sample")
+MEM_FREE_MIN = gauge("gc_mem_free_min_bytes", "Lowest free heap seen")
+MEM_ALLOC = gauge("gc_mem_alloc_bytes", "Allocated heap after the last sample")
+
+# Not available on every port (nor on the host)
+_mem_free = getattr(gc, 'mem_free', None)
+_mem_alloc = getattr(gc, 'mem_alloc', None)
+
+def sample_memory():
+    """Update the heap gauges"""
+    if _mem_free is None:
+        return
+    free = _mem_free()
+    MEM_FREE.value = free
+    if free < MEM_FREE_MIN.value or not MEM_FREE_MIN.value:
+        MEM_FREE_MIN.value = free
+    MEM_ALLOC.value = _mem_alloc()
+
+def render_prometheus():
+    """Get every metric in the Prometheus text exposition format"""
+    sample_memory()
+    out = []
+    for metric in _metrics:
+        metric.render(out)
+    return "".join(out)
+
+def format_us(us):
+    """Format a duration in microseconds for a narrow display (e.g. 850us, 12.5ms)"""
+    if us < 1000:
+        return f"{us}us"
+    if us < 1000000:
+        return f"{us / 1000:.1f}ms"
+    return f"{us / 1000000:.1f}s"
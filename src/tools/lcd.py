@@ -1,18 +1,102 @@
 from machine import Pin, I2C
 import utime
+from lcd_api import LcdApi
 from pico_i2c_lcd import I2cLcd
+from tools.lcd_buffer import LcdBuffer
+from tools import instrumentation
+
+FLUSH_US = instrumentation.histogram("lcd_flush_us", "Time to send the changed cells")
+BYTES_SENT = instrumentation.counter("lcd_bytes_sent_total", "LCD bytes (commands and data) sent")
 
 class LCD(I2cLcd):
-    """Extended LCD class with custom display methods for PicoFreezer."""
+    """Extended LCD class with custom display methods for PicoFreezer.
+
+    Drawing methods (clear, move_to, putchar, putstr) only write into a shadow
+    framebuffer; flush() sends the cells that changed since the last flush.
+    """
 
     def __init__(self, i2c_id=0, i2c_addr=39, sda_pin=0, scl_pin=1, num_rows=2, num_cols=16):
         """Initialize the LCD display with customizable parameters"""
         self.i2c = I2C(i2c_id, sda=Pin(sda_pin), scl=Pin(scl_pin), freq=400000)
+        self.buffer = LcdBuffer(num_rows, num_cols)
+        
+        # LCD bytes (commands + data) a direct repaint would have cost,
+        # what flush() actually sent, and the running difference
+        self.pending_bytes = 0
+        self.bytes_sent = 0
+        self.bytes_saved = 0
+        
         super().__init__(self.i2c, i2c_addr, num_rows, num_cols)
         self.num_rows = num_rows
         self.num_cols = num_cols
         
+        self.hard_clear()
         self.define_custom_chars()
+        self.pending_bytes = 0
+    
+    def clear(self):
+        """Blank the framebuffer (nothing is sent until flush)"""
+        self.buffer.clear()
+        self.cursor_x = 0
+        self.cursor_y = 0
+        # Clear + home on the display
+        self.pending_bytes += 2
+    
+    def move_to(self, cursor_x, cursor_y):
+        """Move the framebuffer cursor"""
+        self.buffer.move_to(cursor_x, cursor_y)
+        self.cursor_x = cursor_x
+        self.cursor_y = cursor_y
+        self.pending_bytes += 1
+    
+    def putchar(self, char):
+        """Write a character into the framebuffer"""
+        self.buffer.putchar(char)
+        self.cursor_x = self.buffer.cursor_x
+        self.cursor_y = self.buffer.cursor_y
+        # LcdApi.putchar sends the data byte followed by a move_to
+        self.pending_bytes += 2
+    
+    def putstr(self, string):
+        """Write a string into the framebuffer"""
+        for char in string:
+            self.putchar(char)
+    
+    def hard_clear(self):
+        """Clear the display itself and reset the framebuffer to match"""
+        LcdApi.clear(self)
+        self.buffer.clear()
+        self.buffer.reset_shadow()
+        self.pending_bytes = 0
+    
+    def redraw(self):
+        """Repaint the whole framebuffer on the next flush"""
+        self.buffer.invalidate()
+    
+    def flush(self):
+        """Send the changed cells, one move_to per contiguous run
+        Returns:
+            int: Number of LCD bytes sent
+        """
+        started = utime.ticks_us()
+        frame = self.buffer.frame
+        sent = 0
+        for col, row, start, end in self.buffer.dirty_runs():
+            LcdApi.move_to(self, col, row)
+            self.hal_write_data_bulk(frame, start, end)
+            sent += 1 + end - start
+        
+        self.bytes_sent += sent
+        BYTES_SENT.inc(sent)
+        if self.pending_bytes > sent:
+            self.bytes_saved += self.pending_bytes - sent
+        self.pending_bytes = 0
+        
+        # Keep the LcdApi cursor in step with the framebuffer
+        self.cursor_x = self.buffer.cursor_x
+        self.cursor_y = self.buffer.cursor_y
+        FLUSH_US.observe(utime.ticks_diff(utime.ticks_us(), started))
+        return sent
     
     def display_text(self, text, row=0, col=0):
         """Display text at specified position"""
@@ -33,7 +117,7 @@ class LCD(I2cLcd):
     
     def display_temperature_screen(self, temp_value, indicator=None):
         """Display temperature on the LCD"""
-        # Clear the display
+        # Clear the framebuffer
         self.clear()
         
         # Display "Temperature:" on the first line
@@ -47,6 +131,8 @@ class LCD(I2cLcd):
         if indicator:
             self.move_to(15, 1)
             self.putchar(indicator)
+        
+        self.flush()
     
     def display_target_temp_screen(self, target_value):
         """Display target temperature setting screen"""
@@ -54,10 +140,12 @@ class LCD(I2cLcd):
         self.center_text("Target Temp:", 0)
         temp_str = f"{target_value:.1f}\1C"
         self.center_text(temp_str, 1)
+        self.flush()
     
     def display_option_screen(self, message, submessage="Returning..."):
         """Display an option screen with message"""
         self.clear()
         self.center_text(message, 0)
         self.center_text(submessage, 1)
+        self.flush()
 
@@ -0,0 +1,74 @@
+class LcdBuffer:
+    """Shadow framebuffer for a character LCD.
+
+    Holds what the screen should show (frame) next to what the LCD is known
+    to show (shadow), so only the cells that differ need to be sent.
+    """
+
+    BLANK = 0x20
+
+    def __init__(self, num_rows, num_cols):
+        """Initialize both buffers as blank screens"""
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.frame = bytearray([self.BLANK]) * (num_rows * num_cols)
+        self.shadow = bytearray([self.BLANK]) * (num_rows * num_cols)
+        self.cursor_x = 0
+        self.cursor_y = 0
+
+    def clear(self):
+        """Blank the frame and move the cursor to the top left corner"""
+        for i in range(len(self.frame)):
+            self.frame[i] = self.BLANK
+        self.cursor_x = 0
+        self.cursor_y = 0
+
+    def move_to(self, cursor_x, cursor_y):
+        """Move the write cursor (zero based)"""
+        self.cursor_x = cursor_x
+        self.cursor_y = cursor_y
+
+    def putchar(self, char):
+        """Write a character at the cursor and advance it, wrapping lines"""
+        if char == '\n':
+            self.cursor_x = self.num_cols
+        else:
+            if self.cursor_x < self.num_cols and self.cursor_y < self.num_rows:
+                self.frame[self.cursor_y * self.num_cols + self.cursor_x] = ord(char) & 0xff
+            self.cursor_x += 1
+        if self.cursor_x >= self.num_cols:
+            self.cursor_x = 0
+            self.cursor_y += 1
+        if self.cursor_y >= self.num_rows:
+            self.cursor_y = 0
+
+    def invalidate(self):
+        """Forget what the LCD shows so the next diff repaints every cell"""
+        for i in range(len(self.shadow)):
+            self.shadow[i] = self.frame[i] ^ 0xff
+
+    def reset_shadow(self):
+        """Mark the LCD as blank (after a hardware clear)"""
+        for i in range(len(self.shadow)):
+            self.shadow[i] = self.BLANK
+
+    def dirty_runs(self):
+        """Yield (col, row, start, end) for each run of changed cells.
+
+        start/end index into frame; the shadow is updated as runs are yielded.
+        """
+        cols = self.num_cols
+        frame = self.frame
+        shadow = self.shadow
+        for row in range(self.num_rows):
+            base = row * cols
+            col = 0
+            while col < cols:
+                if frame[base + col] == shadow[base + col]:
+                    col += 1
+                    continue
+                start = col
+                while col < cols and frame[base + col] != shadow[base + col]:
+                    shadow[base + col] = frame[base + col]
+                    col += 1
+                yield start, row, base + start, base + col
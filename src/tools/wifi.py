@@ -1,76 +1,314 @@
 import network
+import random
 import time
+from tools import instrumentation
+from tools.wifi_password_manager import WiFiPasswordManager
+
+CONNECT_ATTEMPTS = instrumentation.counter("wifi_connect_attempts_total", "WiFi connection attempts")
+CONNECT_FAILURES = instrumentation.counter("wifi_connect_failures_total", "Failed WiFi connection attempts")
+CONNECT_MS = instrumentation.histogram(
+    "wifi_connect_ms", "Time to join a network (or give up)", instrumentation.LATENCY_MS)
+SCAN_MS = instrumentation.histogram("wifi_scan_ms", "Time for a network scan", instrumentation.LATENCY_MS)
+LINK_LOSSES = instrumentation.counter("wifi_link_lost_total", "Connections dropped by the network")
+
+class Network:
+    """One scanned network (the strongest access point seen for its SSID)"""
+
+    def __init__(self, ssid, bssid, channel, rssi, security):
+        """Initialize from a wlan.scan() record"""
+        self.ssid = ssid
+        self.bssid = bssid
+        self.channel = channel
+        self.rssi = rssi
+        self.security = security
+        # Whether a password is saved for it (see WiFi.get_networks)
+        self.saved = False
 
 class WiFi:
-    """Manages WiFi connections for the PicoFreezer device."""
+    """Manages WiFi connections for the PicoFreezer device.
+
+    Connecting is a non-blocking state machine advanced by poll(), which
+    the runtime calls periodically. When the link drops (or at startup),
+    the saved networks are tried strongest first, with exponential backoff
+    and jitter between rounds. Listeners get "connected", "disconnected"
+    and "failed" events.
+
+    Scan results are cached (deduplicated by SSID and sorted by signal).
+    wlan.scan() blocks the whole asyncio loop for a few seconds, so poll()
+    only refreshes the cache on request, and right before a reconnect
+    round when the results are too old to order the saved networks.
+    """
+
+    # Connection states
+    IDLE = 0
+    CONNECTING = 1
+    CONNECTED = 2
+    BACKOFF = 3
 
-    def __init__(self):
-        """Initialize the WiFi module"""
+    # wlan.status() values (CYW43)
+    STAT_GOT_IP = 3
+
+    # Give up on a network that has not given us an IP by then
+    CONNECT_TIMEOUT_MS = 10000
+    # Wait before the next round over the saved networks, doubled per failed round
+    BACKOFF_MIN_MS = 2000
+    BACKOFF_MAX_MS = 300000
+    # Scan results older than this are stale (get_networks callers request a refresh)
+    SCAN_TTL_MS = 30000
+    # Older scan results are refreshed before a reconnect round (keeps its order current)
+    SCAN_REFRESH_MS = 60000
+
+    def __init__(self, password_manager=None, auto_reconnect=True):
+        """Initialize the WiFi module
+
+        Args:
+            password_manager (WiFiPasswordManager): Saved networks (default: the stored ones)
+            auto_reconnect (bool): Join saved networks at startup and after a dropout
+        """
         self.wlan = network.WLAN(network.STA_IF)
         self.wlan.active(True)
         
+        self.password_manager = password_manager if password_manager is not None else WiFiPasswordManager()
+        self.auto_reconnect = auto_reconnect
+        
         self.connected = False
         self.current_ssid = None
+        
+        # Last RSSI seen per SSID (scans and joined networks)
+        self.rssi_seen = {}
+        
+        # Cached scan results, strongest first, and when they were taken
+        self.networks = []
+        self.scanned_at = None
+        self._scan_requested = False
+        
+        self.state = self.BACKOFF if auto_reconnect else self.IDLE
+        # Network being joined and whether its password is saved on success
+        self.target_ssid = None
+        self._target_password = None
+        self._save_on_success = False
+        self._started = 0
+        # Saved networks still to try in this round
+        self._candidates = []
+        self._failed_rounds = 0
+        self._retry_at = time.ticks_ms()
+        
+        self.listeners = []
+    
+    def add_listener(self, callback):
+        """Register callback(event, ssid) for connection events"""
+        self.listeners.append(callback)
+    
+    def _publish(self, event, ssid):
+        """Tell the listeners about a connection event"""
+        print(f"WiFi {event}: {ssid}")
+        for callback in self.listeners:
+            try:
+                callback(event, ssid)
+            except Exception as e:
+                print(f"Error in WiFi listener: {e}")
     
     def scan_networks(self):
-        """Scan for available WiFi networks
+        """Scan for available WiFi networks (blocking) and refresh the cache
         Returns:
-            list: List of network SSIDs
+            list: Network records, one per SSID, strongest first
         """
         # Ensure the interface is active
         if not self.wlan.active():
             self.wlan.active(True)
         
         # Scan for networks
-        networks = self.wlan.scan()
-        # Format the results - extract SSIDs
-        results = []
+        start = time.ticks_ms()
+        try:
+            records = self.wlan.scan()
+        finally:
+            self.scanned_at = time.ticks_ms()
+            self._scan_requested = False
+            SCAN_MS.observe(time.ticks_diff(self.scanned_at, start))
+        
+        # Keep the strongest access point of each SSID (skipping hidden networks)
+        by_ssid = {}
+        for record in records:
+            ssid = record[0].decode('utf-8') if isinstance(record[0], bytes) else record[0]
+            if not ssid:
+                continue
+            known = by_ssid.get(ssid)
+            if known is None or record[3] > known.rssi:
+                by_ssid[ssid] = Network(ssid, record[1], record[2], record[3], record[4])
+        
+        networks = sorted(by_ssid.values(), key=lambda net: net.rssi, reverse=True)
         for net in networks:
-            ssid = net[0].decode('utf-8') if isinstance(net[0], bytes) else net[0]
-            results.append(ssid)
-        return results
+            self.rssi_seen[net.ssid] = net.rssi
+        self.networks = networks
+        return self.get_networks()
+    
+    def get_networks(self):
+        """Get the cached scan results without scanning
+        Returns:
+            list: Network records, strongest first, with their saved flags current
+        """
+        passwords = self.password_manager.passwords
+        for net in self.networks:
+            net.saved = net.ssid in passwords
+        return self.networks
+    
+    def scan_age_ms(self):
+        """Get the age of the cached scan results (None if there are none)"""
+        if self.scanned_at is None:
+            return None
+        return time.ticks_diff(time.ticks_ms(), self.scanned_at)
+    
+    def request_scan(self):
+        """Ask poll() to refresh the scan results"""
+        self._scan_requested = True
+    
+    def _scan_due(self):
+        """Check whether poll() should refresh the scan results now"""
+        # Scanning while associating would disturb the association
+        return self._scan_requested and self.state != self.CONNECTING
+    
+    def _scan(self):
+        """Refresh the scan results, reporting a failure instead of raising"""
+        try:
+            self.scan_networks()
+        except Exception as e:
+            print(f"WiFi scan failed: {e}")
     
-    def connect(self, ssid, password):
-        """Connect to a WiFi network
+    def connect(self, ssid, password, save=False):
+        """Start joining a network (returns immediately; see poll() and state)
         Args:
             ssid (str): Network SSID
             password (str): Network password
-        Returns:
-            bool: True if connected successfully, False otherwise
+            save (bool): Save the password once the connection succeeds
         """
-        # Connect to the network
+        self._candidates = []
+        self._save_on_success = save
+        self._start(ssid, password)
+    
+    def _start(self, ssid, password):
+        """Begin an association attempt"""
+        CONNECT_ATTEMPTS.inc()
+        self.state = self.CONNECTING
+        self.target_ssid = ssid
+        self._target_password = password
+        self._started = time.ticks_ms()
+        self.connected = False
+        self.current_ssid = None
         self.wlan.connect(ssid, password)
+    
+    def poll(self):
+        """Advance the connection state machine (only a due scan blocks)"""
+        state = self.state
+        if state == self.CONNECTING:
+            self._poll_connecting()
+        elif state == self.CONNECTED:
+            if not self.wlan.isconnected():
+                LINK_LOSSES.inc()
+                ssid = self.current_ssid
+                self.connected = False
+                self.current_ssid = None
+                self._failed_rounds = 0
+                self._schedule_retry(0)
+                self._publish("disconnected", ssid)
+        elif self.wlan.isconnected():
+            # Joined outside the state machine (e.g. before a soft reset)
+            self._on_connected(self.wlan.config('essid'))
+        elif state == self.BACKOFF and time.ticks_diff(time.ticks_ms(), self._retry_at) >= 0:
+            age = self.scan_age_ms()
+            if self.password_manager.passwords and (age is None or age >= self.SCAN_REFRESH_MS):
+                # Order the round by current signal strengths
+                self._scan()
+            self._start_round()
+            return
         
-        # Wait for connection (with timeout)
-        max_wait = 10
-        while max_wait > 0:
-            if self.wlan.status() < 0 or self.wlan.status() >= 3:
-                break
-            max_wait -= 1
-            print("Waiting for connection...")
-            time.sleep(1)
+        if self._scan_due():
+            self._scan()
         
-        # Check if connection was successful
-        if self.wlan.status() == 3:
-            self.connected = True
-            self.current_ssid = ssid
-            print(f"Connected to {ssid}")
-            print(f"IP: {self.wlan.ifconfig()[0]}")
-            return True
+        # Drop obsolete password records off the GUI's save path
+        self.password_manager.compact_if_due()
+    
+    def _poll_connecting(self):
+        """Check the association in progress"""
+        status = self.wlan.status()
+        if status == self.STAT_GOT_IP:
+            CONNECT_MS.observe(time.ticks_diff(time.ticks_ms(), self._started))
+            if self._save_on_success:
+                self.password_manager.save_password(self.target_ssid, self._target_password)
+            self._on_connected(self.target_ssid)
+            return
+        
+        if status >= 0 and time.ticks_diff(time.ticks_ms(), self._started) < self.CONNECT_TIMEOUT_MS:
+            return
+        
+        # Rejected or timed out
+        CONNECT_MS.observe(time.ticks_diff(time.ticks_ms(), self._started))
+        CONNECT_FAILURES.inc()
+        print(f"Failed to connect to {self.target_ssid} (status {status})")
+        self.wlan.disconnect()
+        self._save_on_success = False
+        self._publish("failed", self.target_ssid)
+        if self._candidates:
+            self._try_next_candidate()
+        elif self.auto_reconnect:
+            self._failed_rounds += 1
+            self._schedule_retry(self._backoff_ms())
         else:
-            self.connected = False
-            self.current_ssid = None
-            print(f"Failed to connect to {ssid}")
-            print(f"Status: {self.wlan.status()}")
-            return False
+            self.state = self.IDLE
+    
+    def _on_connected(self, ssid):
+        """Enter the connected state"""
+        self.state = self.CONNECTED
+        self.connected = True
+        self.current_ssid = ssid
+        self._candidates = []
+        self._failed_rounds = 0
+        self._save_on_success = False
+        self.rssi_seen[ssid] = self.wlan.status('rssi')
+        print(f"IP: {self.wlan.ifconfig()[0]}")
+        self._publish("connected", ssid)
+    
+    def _backoff_ms(self):
+        """Get the wait before the next round: capped exponential with equal jitter"""
+        delay = min(self.BACKOFF_MAX_MS, self.BACKOFF_MIN_MS << min(self._failed_rounds - 1, 16))
+        half = delay // 2
+        return half + ((random.getrandbits(16) * half) >> 16)
+    
+    def _schedule_retry(self, delay_ms):
+        """Wait before the next round over the saved networks"""
+        if not self.auto_reconnect:
+            self.state = self.IDLE
+            return
+        self.state = self.BACKOFF
+        self._retry_at = time.ticks_add(time.ticks_ms(), delay_ms)
+    
+    def _start_round(self):
+        """Try the saved networks, strongest last-seen signal first"""
+        passwords = self.password_manager.passwords
+        rssi_seen = self.rssi_seen
+        self._candidates = sorted(passwords, key=lambda ssid: rssi_seen.get(ssid, -1000), reverse=True)
+        if not self._candidates:
+            # Nothing to join; look again later (a password may be saved meanwhile)
+            self._schedule_retry(self.BACKOFF_MAX_MS)
+            return
+        self._try_next_candidate()
+    
+    def _try_next_candidate(self):
+        """Start joining the next saved network of the round"""
+        ssid = self._candidates.pop(0)
+        self._start(ssid, self.password_manager.get_password(ssid))
     
     def disconnect(self):
-        """Disconnect from the current WiFi network"""
-        if self.connected:
+        """Disconnect from the current WiFi network (no automatic reconnect until the next connect)"""
+        state = self.state
+        self.state = self.IDLE
+        self._candidates = []
+        if state == self.CONNECTING or self.connected:
             self.wlan.disconnect()
+            ssid = self.current_ssid
             self.connected = False
             self.current_ssid = None
-            print("Disconnected from WiFi")
+            if ssid is not None:
+                self._publish("disconnected", ssid)
     
     def is_connected(self):
         """Check if connected to a WiFi network
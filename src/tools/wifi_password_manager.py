@@ -1,45 +1,207 @@
+import os
+
 class WiFiPasswordManager:
-    """Manages saved WiFi passwords"""
-    
-    def __init__(self, password_file='storage/passwords.txt'):
-        """Initialize with a password file"""
+    """Manages saved WiFi passwords.
+
+    Passwords live in an append-only file of length-prefixed records
+    (operation, SSID length, password length, SSID, password), so a save
+    writes one record instead of the whole file and SSIDs may contain any
+    character. The file is read once into an in-RAM index; records made
+    obsolete by later saves are dropped by compact(), which rewrites the
+    live entries to a temporary file and renames it over the store, so a
+    power loss leaves either the old or the new file.
+    """
+
+    MAGIC = b'PFW1'
+    # Record operations
+    SET = 1
+    DELETE = 2
+    # Record header: operation, SSID length, password length
+    HEADER_SIZE = 3
+    # Compact once this share of the records is obsolete (and there are enough of them)
+    COMPACT_RATIO = 0.5
+    COMPACT_MIN_RECORDS = 8
+
+    def __init__(self, password_file='storage/passwords.bin', legacy_file='storage/passwords.txt'):
+        """Initialize with a password file
+
+        Args:
+            password_file (str): Record store
+            legacy_file (str): Comma-separated file imported when the store does not exist yet
+        """
         self.password_file = password_file
+        self.legacy_file = legacy_file
         self.passwords = {}
+        # Records in the file, including obsolete ones
+        self.records = 0
+        # Set when obsolete records should be dropped (see compact_if_due)
+        self.compact_due = False
+        # Set when the file ends in a torn record and must be rewritten before appending
+        self._torn = False
         self.load_passwords()
-    
+
     def load_passwords(self):
         """Load saved passwords from file"""
+        self.passwords = {}
+        self.records = 0
         try:
-            with open(self.password_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and ',' in line:
-                        parts = line.split(',', 1)  # Split only on first comma
-                        if len(parts) == 2:
-                            ssid, password = parts
-                            self.passwords[ssid] = password
-            print(f"Loaded {len(self.passwords)} WiFi passwords")
+            with open(self.password_file, 'rb') as f:
+                data = f.read()
         except OSError:
             # File might not exist yet
+            if self._import_legacy():
+                return
             print("No saved passwords found or couldn't read password file")
-            self.passwords = {}
-    
+            return
+
+        if data[:len(self.MAGIC)] != self.MAGIC:
+            print("Unknown password file format - ignoring it")
+            self._torn = True
+            return
+
+        offset = self._parse(data)
+        if offset != len(data):
+            # Torn append (e.g. power loss): rewrite before appending again
+            print("Dropping incomplete password record")
+            self._torn = True
+        print(f"Loaded {len(self.passwords)} WiFi passwords")
+
+    def _parse(self, data):
+        """Apply the records to the index
+        Returns:
+            int: Offset after the last complete record
+        """
+        view = memoryview(data)
+        offset = len(self.MAGIC)
+        end = len(data)
+        while offset + self.HEADER_SIZE <= end:
+            operation = data[offset]
+            ssid_end = offset + self.HEADER_SIZE + data[offset + 1]
+            record_end = ssid_end + data[offset + 2]
+            if record_end > end or operation not in (self.SET, self.DELETE):
+                break
+            ssid = str(view[offset + self.HEADER_SIZE:ssid_end], 'utf-8')
+            if operation == self.SET:
+                self.passwords[ssid] = str(view[ssid_end:record_end], 'utf-8')
+            else:
+                self.passwords.pop(ssid, None)
+            self.records += 1
+            offset = record_end
+        return offset
+
+    def _import_legacy(self):
+        """Convert a comma-separated password file to the record store
+        Returns:
+            bool: True if there was one
+        """
+        try:
+            with open(self.legacy_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if ',' in line:
+                        ssid, password = line.split(',', 1)  # Split only on first comma
+                        self.passwords[ssid] = password
+        except OSError:
+            return False
+        if self.compact():
+            try:
+                os.remove(self.legacy_file)
+            except OSError:
+                pass
+        print(f"Imported {len(self.passwords)} WiFi passwords")
+        return True
+
     def get_password(self, ssid):
         """Get the saved password for a SSID if it exists"""
         return self.passwords.get(ssid)
-    
+
     def save_password(self, ssid, password):
         """Save a new password or update existing one"""
+        if self.passwords.get(ssid) == password:
+            return True
+        if not self._append(self.SET, ssid, password):
+            return False
+
         # Update the in-memory dictionary
         self.passwords[ssid] = password
-        
-        # Write all passwords back to file
-        try:
-            with open(self.password_file, 'w') as f:
-                for network, pwd in self.passwords.items():
-                    f.write(f"{network},{pwd}\n")
-            print(f"Saved password for network: {ssid}")
+        print(f"Saved password for network: {ssid}")
+        return True
+
+    def delete_password(self, ssid):
+        """Forget the password of a network"""
+        if ssid not in self.passwords:
             return True
+        if not self._append(self.DELETE, ssid, ""):
+            return False
+        del self.passwords[ssid]
+        return True
+
+    def _append(self, operation, ssid, password):
+        """Append one record to the file
+        Returns:
+            bool: True if written
+        """
+        ssid_bytes = ssid.encode('utf-8')
+        password_bytes = password.encode('utf-8')
+        if len(ssid_bytes) > 255 or len(password_bytes) > 255:
+            print("Failed to save password: SSID or password too long")
+            return False
+        if self._torn and not self.compact():
+            # Never append after a torn record
+            return False
+
+        record = bytes((operation, len(ssid_bytes), len(password_bytes))) + ssid_bytes + password_bytes
+        try:
+            new_file = self.records == 0 and not self._exists()
+            with open(self.password_file, 'ab') as f:
+                if new_file:
+                    f.write(self.MAGIC)
+                f.write(record)
         except OSError as e:
             print(f"Failed to save password: {e}")
             return False
+
+        self.records += 1
+        if (self.records >= self.COMPACT_MIN_RECORDS and
+                self.records - len(self.passwords) > self.records * self.COMPACT_RATIO):
+            self.compact_due = True
+        return True
+
+    def compact_if_due(self):
+        """Drop obsolete records once enough have piled up (called from a background task)"""
+        if self.compact_due:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the file with the live records only, atomically
+        Returns:
+            bool: True if rewritten
+        """
+        temp_file = self.password_file + '.tmp'
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(self.MAGIC)
+                for ssid, password in self.passwords.items():
+                    ssid_bytes = ssid.encode('utf-8')
+                    password_bytes = password.encode('utf-8')
+                    f.write(bytes((self.SET, len(ssid_bytes), len(password_bytes))))
+                    f.write(ssid_bytes)
+                    f.write(password_bytes)
+            # Replaces the old file in one step on LittleFS (and POSIX)
+            os.rename(temp_file, self.password_file)
+        except OSError as e:
+            print(f"Failed to compact passwords: {e}")
+            return False
+
+        self.records = len(self.passwords)
+        self.compact_due = False
+        self._torn = False
+        return True
+
+    def _exists(self):
+        """Check whether the password file exists"""
+        try:
+            os.stat(self.password_file)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,118 @@
+import hashlib
+import binascii
+import os
+
+class Asset:
+    """One static file (or generated body) with its pre-encoded response headers.
+
+    File assets are not kept in RAM: only their path, size and ETag are,
+    and the server streams the file from flash. Generated content keeps
+    its body.
+    """
+
+    # Read size while hashing a file
+    HASH_CHUNK = 512
+
+    def __init__(self, content_type, path=None, body=None, gzip=False, vary=False):
+        """Hash the content and build the 200 and 304 headers once
+
+        Args:
+            content_type (str): MIME type
+            path (str): File to stream (for file assets)
+            body (bytes): Content (for generated assets)
+            gzip (bool): The content is gzip-compressed (Content-Encoding: gzip)
+            vary (bool): Another encoding of the same URL exists (Vary: Accept-Encoding)
+        """
+        self.path = path
+        self.body = body
+        self.content_type = content_type
+        self.gzip = gzip
+        # Compressed variant of this asset, if any
+        self.gzipped = None
+
+        digest = hashlib.sha256()
+        if body is not None:
+            digest.update(body)
+            self.size = len(body)
+        else:
+            self.size = 0
+            chunk = bytearray(self.HASH_CHUNK)
+            view = memoryview(chunk)
+            with open(path, 'rb') as f:
+                while True:
+                    count = f.readinto(chunk)
+                    if not count:
+                        break
+                    digest.update(view[:count])
+                    self.size += count
+        self.etag = '"' + binascii.hexlify(digest.digest()[:8]).decode() + '"'
+
+        extra = ""
+        if gzip:
+            extra += "Content-Encoding: gzip\r\n"
+        if vary:
+            extra += "Vary: Accept-Encoding\r\n"
+
+        head = ("HTTP/1.1 200 OK\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {self.size}\r\n"
+                f"ETag: {self.etag}\r\n"
+                "Cache-Control: no-cache\r\n" + extra)
+        self.head_keep_alive = (head + "Connection: keep-alive\r\n\r\n").encode()
+        self.head_close = (head + "Connection: close\r\n\r\n").encode()
+
+        head = ("HTTP/1.1 304 Not Modified\r\n"
+                f"ETag: {self.etag}\r\n"
+                "Cache-Control: no-cache\r\n" + extra)
+        self.not_modified_keep_alive = (head + "Connection: keep-alive\r\n\r\n").encode()
+        self.not_modified_close = (head + "Connection: close\r\n\r\n").encode()
+
+    def matches(self, if_none_match):
+        """Check an If-None-Match header value against this asset's ETag"""
+        if not if_none_match:
+            return False
+        return if_none_match.strip() == '*' or self.etag in if_none_match
+
+class AssetCache:
+    """Static web files under web_root, described once at startup.
+
+    A file with a precompressed '.gz' sibling (see build_web.py at the
+    repository root) gets a gzip variant served to clients that accept it.
+    """
+
+    def __init__(self, web_root):
+        """Initialize an empty cache for files under web_root"""
+        self.web_root = web_root
+        self.assets = {}
+
+    def add_file(self, url_path, filename, content_type):
+        """Register a file (and its .gz variant if present)
+        Returns:
+            bool: True if the file exists
+        """
+        path = f'{self.web_root}/{filename}'
+        gz_path = path + '.gz'
+        try:
+            os.stat(gz_path)
+            has_gzip = True
+        except OSError:
+            has_gzip = False
+
+        try:
+            asset = Asset(content_type, path=path, vary=has_gzip)
+            if has_gzip:
+                asset.gzipped = Asset(content_type, path=gz_path, gzip=True, vary=True)
+        except OSError as e:
+            print(f"Error loading {filename}: {e}")
+            return False
+
+        self.assets[url_path] = asset
+        return True
+
+    def add_bytes(self, url_path, body, content_type):
+        """Cache generated content under a URL path"""
+        self.assets[url_path] = Asset(content_type, body=body)
+
+    def get(self, url_path):
+        """Get the asset for a URL path, or None"""
+        return self.assets.get(url_path)
@@ -0,0 +1,336 @@
+from array import array
+
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+# Headers the server looks at; values are found through their index
+CONTENT_LENGTH = 0
+CONNECTION = 1
+IF_NONE_MATCH = 2
+ACCEPT_ENCODING = 3
+HEADER_NAMES = (b'content-length', b'connection', b'if-none-match', b'accept-encoding')
+
+_CR = 13
+_LF = 10
+_SPACE = 32
+_TAB = 9
+_COLON = 58
+_QUESTION = 63
+_COMMA = 44
+_SEMICOLON = 59
+_EQUALS = 61
+_DOT = 46
+_ZERO = 48
+_STAR = 42
+_LOWER_Q = 113
+
+class RequestParser:
+    """HTTP/1.x request reader working in place on one reusable buffer.
+
+    Requests are received into a preallocated bytearray and parsed line by
+    line as the bytes arrive: the request line and the wanted headers are
+    recorded as offsets into the buffer, so nothing is copied or decoded
+    unless a handler asks for it. One parser serves all requests of a
+    connection, including pipelined ones.
+    """
+
+    def __init__(self, max_header_bytes=2048, max_body_bytes=1024):
+        """Initialize the buffer
+
+        Args:
+            max_header_bytes (int): Largest accepted request line + headers
+            max_body_bytes (int): Largest accepted body (Content-Length)
+        """
+        self.max_header_bytes = max_header_bytes
+        self.max_body_bytes = max_body_bytes
+        self.buffer = bytearray(max_header_bytes + max_body_bytes)
+        self.view = memoryview(self.buffer)
+        # Bytes received, and where the current request ends (next one starts)
+        self.end = 0
+        self.request_end = 0
+        # Offsets of the parsed request
+        self.request_start = 0
+        self.method_end = 0
+        self.path_end = 0
+        self.query_start = 0
+        self.target_end = 0
+        self.http_10 = False
+        self.body_start = 0
+        self.content_length = 0
+        # Start and end offset of each wanted header value (-1 when absent)
+        self.headers = array('h', [-1] * (2 * len(HEADER_NAMES)))
+
+    async def read(self, reader, first_timeout, timeout):
+        """Receive and parse the next request
+
+        Args:
+            reader (StreamReader): Connection
+            first_timeout (float): Seconds to wait for the request to start
+            timeout (float): Seconds allowed for the rest of it
+        Returns:
+            bool: True when a request is ready, False on a clean end of stream
+        Raises:
+            ValueError: Malformed or oversized request
+        """
+        self._discard_previous()
+        for i in range(len(self.headers)):
+            self.headers[i] = -1
+        self.content_length = 0
+        self.method_end = 0
+
+        line_start = 0
+        scanned = 0
+        # Offset after the blank line ending the headers, once seen
+        header_end = -1
+        while header_end < 0:
+            if scanned == self.end:
+                if self.end >= self.max_header_bytes:
+                    raise ValueError("headers too large")
+                received = await self._fill(reader, self.max_header_bytes,
+                                            first_timeout if self.end == 0 else timeout)
+                if not received:
+                    if self.end == 0:
+                        return False
+                    raise ValueError("incomplete request")
+            buffer = self.buffer
+            end = self.end
+            while scanned < end:
+                if buffer[scanned] == _LF:
+                    line_end = scanned
+                    if line_end > line_start and buffer[line_end - 1] == _CR:
+                        line_end -= 1
+                    scanned += 1
+                    if line_end == line_start:
+                        if self.method_end:
+                            header_end = scanned
+                            break
+                        # Blank lines before a request are tolerated
+                    elif not self.method_end:
+                        self._parse_request_line(line_start, line_end)
+                    else:
+                        self._parse_header(line_start, line_end)
+                    line_start = scanned
+                else:
+                    scanned += 1
+
+        self._parse_content_length()
+        self.body_start = header_end
+        self.request_end = header_end + self.content_length
+        while self.end < self.request_end:
+            if not await self._fill(reader, len(self.buffer), timeout):
+                raise ValueError("incomplete body")
+        return True
+
+    def _discard_previous(self):
+        """Drop the previous request, keeping any pipelined bytes after it"""
+        extra = self.end - self.request_end
+        if extra > 0:
+            self.buffer[:extra] = bytes(self.view[self.request_end:self.end])
+        self.end = max(0, extra)
+        self.request_end = 0
+
+    async def _fill(self, reader, limit, timeout):
+        """Receive more bytes into the buffer (up to limit)
+        Returns:
+            int: Bytes received (0 at end of stream)
+        """
+        view = self.view[self.end:limit]
+        if hasattr(reader, 'readinto'):
+            count = await asyncio.wait_for(reader.readinto(view), timeout)
+        else:
+            # CPython streams have no readinto
+            data = await asyncio.wait_for(reader.read(len(view)), timeout)
+            count = len(data)
+            view[:count] = data
+        self.end += count
+        return count
+
+    def _parse_request_line(self, start, end):
+        """Record the method, path, query and version offsets"""
+        buffer = self.buffer
+        first = -1
+        second = -1
+        for i in range(start, end):
+            if buffer[i] == _SPACE:
+                if first < 0:
+                    first = i
+                elif second < 0:
+                    second = i
+                else:
+                    raise ValueError("malformed request line")
+        if first <= start or second <= first + 1 or second == end - 1:
+            raise ValueError("malformed request line")
+        if not self._equals(second + 1, end - 1, b'HTTP/1.') or not 48 <= buffer[end - 1] <= 57:
+            raise ValueError("unsupported version")
+
+        self.request_start = start
+        self.method_end = first
+        self.target_end = second
+        self.path_end = second
+        self.query_start = second
+        for i in range(first + 1, second):
+            if buffer[i] == _QUESTION:
+                self.path_end = i
+                self.query_start = i + 1
+                break
+        self.http_10 = buffer[end - 1] == 48
+
+    def _parse_header(self, start, end):
+        """Record the value offsets of a wanted header"""
+        buffer = self.buffer
+        colon = -1
+        for i in range(start, end):
+            if buffer[i] == _COLON:
+                colon = i
+                break
+        if colon <= start:
+            raise ValueError("malformed header")
+
+        for index in range(len(HEADER_NAMES)):
+            if self._equals_lower(start, colon, HEADER_NAMES[index]):
+                value_start = colon + 1
+                while value_start < end and buffer[value_start] in (_SPACE, _TAB):
+                    value_start += 1
+                value_end = end
+                while value_end > value_start and buffer[value_end - 1] in (_SPACE, _TAB):
+                    value_end -= 1
+                self.headers[2 * index] = value_start
+                self.headers[2 * index + 1] = value_end
+                return
+
+    def _parse_content_length(self):
+        """Read the Content-Length value in place"""
+        start = self.headers[2 * CONTENT_LENGTH]
+        if start < 0:
+            return
+        end = self.headers[2 * CONTENT_LENGTH + 1]
+        if start == end:
+            raise ValueError("bad Content-Length")
+        length = 0
+        buffer = self.buffer
+        for i in range(start, end):
+            digit = buffer[i] - 48
+            if not 0 <= digit <= 9:
+                raise ValueError("bad Content-Length")
+            length = length * 10 + digit
+            if length > self.max_body_bytes:
+                raise ValueError("body too large")
+        self.content_length = length
+
+    def _equals(self, start, end, literal):
+        """Compare a buffer range with a bytes literal"""
+        if end - start != len(literal):
+            return False
+        buffer = self.buffer
+        for i in range(len(literal)):
+            if buffer[start + i] != literal[i]:
+                return False
+        return True
+
+    def _equals_lower(self, start, end, literal):
+        """Compare a buffer range with a lower-case literal, ignoring ASCII case"""
+        if end - start != len(literal):
+            return False
+        buffer = self.buffer
+        for i in range(len(literal)):
+            char = buffer[start + i]
+            if 65 <= char <= 90:
+                char += 32
+            if char != literal[i]:
+                return False
+        return True
+
+    def route_key(self):
+        """Get b'METHOD /path' (query excluded) for the route table"""
+        return bytes(self.view[self.request_start:self.path_end])
+
+    def header(self, index):
+        """Get a wanted header value as a memoryview into the buffer (None if absent)"""
+        start = self.headers[2 * index]
+        if start < 0:
+            return None
+        return self.view[start:self.headers[2 * index + 1]]
+
+    def header_equals(self, index, literal):
+        """Check a wanted header value against a lower-case literal, ignoring case"""
+        start = self.headers[2 * index]
+        return start >= 0 and self._equals_lower(start, self.headers[2 * index + 1], literal)
+
+    def header_accepts(self, index, token):
+        """Check whether a wanted list header (e.g. Accept-Encoding) accepts a token
+
+        Elements are matched by name, ignoring case; a weight of q=0 refuses
+        the token, and '*' stands for any token not listed by name.
+
+        Args:
+            index (int): Header index (e.g. ACCEPT_ENCODING)
+            token (bytes): Lower-case token (e.g. b'gzip')
+        Returns:
+            bool: True if the token is listed, or covered by '*', with a non-zero weight
+        """
+        start = self.headers[2 * index]
+        if start < 0:
+            return False
+        end = self.headers[2 * index + 1]
+        buffer = self.buffer
+        wildcard = False
+        while start < end:
+            element_end = start
+            while element_end < end and buffer[element_end] != _COMMA:
+                element_end += 1
+            name_start = start
+            while name_start < element_end and buffer[name_start] in (_SPACE, _TAB):
+                name_start += 1
+            name_end = name_start
+            while name_end < element_end and buffer[name_end] not in (_SEMICOLON, _SPACE, _TAB):
+                name_end += 1
+            if self._equals_lower(name_start, name_end, token):
+                return not self._zero_weight(name_end, element_end)
+            if name_end == name_start + 1 and buffer[name_start] == _STAR:
+                wildcard = not self._zero_weight(name_end, element_end)
+            start = element_end + 1
+        return wildcard
+
+    def _zero_weight(self, start, end):
+        """Check whether the parameters of a list element set q=0 (0, 0. or 0.000)"""
+        buffer = self.buffer
+        i = start
+        while i < end:
+            if buffer[i] != _SEMICOLON:
+                i += 1
+                continue
+            i += 1
+            while i < end and buffer[i] in (_SPACE, _TAB):
+                i += 1
+            # 'q=' or 'Q=' (OR-ing 32 lower-cases a letter)
+            if i + 1 < end and buffer[i] | 32 == _LOWER_Q and buffer[i + 1] == _EQUALS:
+                i += 2
+                if i >= end or buffer[i] != _ZERO:
+                    return False
+                i += 1
+                if i < end and buffer[i] == _DOT:
+                    i += 1
+                while i < end and buffer[i] == _ZERO:
+                    i += 1
+                while i < end and buffer[i] in (_SPACE, _TAB):
+                    i += 1
+                return i >= end or buffer[i] == _SEMICOLON
+        return False
+
+    def query(self):
+        """Get the query string (decoded on request)"""
+        if self.query_start >= self.target_end:
+            return ''
+        return str(self.view[self.query_start:self.target_end], 'utf-8')
+
+    def body(self):
+        """Get the body as a memoryview into the buffer"""
+        return self.view[self.body_start:self.request_end]
+
+    def keep_alive(self):
+        """Check if the connection should stay open after this request"""
+        if self.http_10:
+            return self.header_equals(CONNECTION, b'keep-alive')
+        return not self.header_equals(CONNECTION, b'close')
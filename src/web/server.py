@@ -1,188 +1,491 @@
-import socket
-import time
 import gc
 import json
+import os
+import struct
+import time
+from web.assets import AssetCache
+from web.http import RequestParser, IF_NONE_MATCH, ACCEPT_ENCODING
+from tools import instrumentation
+
+CONNECTIONS = instrumentation.gauge("http_connections", "Open client connections")
+CONNECTIONS_TOTAL = instrumentation.counter("http_connections_total", "Accepted client connections")
+REQUESTS = instrumentation.counter("http_requests_total", "Requests handled")
+ERROR_RESPONSES = instrumentation.counter("http_error_responses_total", "4xx and 5xx responses sent")
+REQUEST_WAIT_MS = instrumentation.histogram(
+    "http_request_wait_ms", "Time a connection waited for its next request",
+    instrumentation.LATENCY_MS)
+REQUEST_US = instrumentation.histogram("http_request_us", "Time to route and answer a request")
+
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
 
 class WebServer:
-    """Simple web server for PicoFreezer temperature monitoring."""
+    """Asynchronous web server for PicoFreezer temperature monitoring.
+
+    Built on asyncio streams, so several clients are served concurrently.
+    HTTP/1.1 connections are kept alive until they sit idle for IDLE_TIMEOUT.
+    Each connection parses its requests in place in one reusable buffer
+    (see web.http) and dispatches them through a table keyed by
+    b'METHOD /path'.
+    """
 
-    def __init__(self, wifi_manager, temp_monitor):
-        """Initialize the web server"""
+    # Seconds a kept-alive connection may wait for its next request
+    IDLE_TIMEOUT = 5
+    # Seconds allowed for the rest of a request once its first line arrived,
+    # and for the client to take each part of a response
+    REQUEST_TIMEOUT = 3
+    # Largest accepted request line + headers, and body (bytes)
+    MAX_HEADER_BYTES = 2048
+    MAX_BODY_BYTES = 1024
+    # Pending connections queued by the TCP stack
+    BACKLOG = 5
+    # How often an event stream checks for new data (ms)
+    STREAM_POLL_MS = 100
+    # Comment line sent on an otherwise idle event stream (ms)
+    STREAM_HEARTBEAT_MS = 15000
+    # Size of one chunk of a streamed file or history response (bytes)
+    CHUNK_BYTES = 512
+    # Default span of /api/history when no range is given (seconds)
+    HISTORY_DEFAULT_SPAN = 3600
+    # Defaults for the listening port and the static file directory
+    PORT = 80
+    WEB_ROOT = '/src/web'
+
+    def __init__(self, wifi_manager, temp_monitor, port=None, web_root=None):
+        """Initialize the web server (port/web_root default to PORT/WEB_ROOT)"""
         self.wifi = wifi_manager
         self.temp_monitor = temp_monitor
-        self.server_socket = None
+        self.port = port if port is not None else self.PORT
+        self.web_root = web_root if web_root is not None else self.WEB_ROOT
+        self.server = None
         self.is_running = False
-        self.last_update_time = 0
         
-        self._html = self._load_html_template()
+        # Writers of the currently open client connections
+        self.clients = []
+        
+        self.assets = self._load_assets()
+        self.routes = self._build_routes()
+        
+        # Reused by every streamed file and history response (one at a time)
+        self._chunk = bytearray(self.CHUNK_BYTES)
+        self._chunk_lock = asyncio.Lock()
+        # Reused monitor state copy for the data responses
+        self._state = temp_monitor.snapshot()
         
     def start(self):
-        """Start the web server if WiFi is connected"""
-        if not self.wifi.is_connected():
+        """Start the web server if WiFi is connected
+
+        Must be called from a running event loop; the listening socket is
+        opened by a task, so this returns immediately.
+        """
+        if self.wifi is not None and not self.wifi.is_connected():
             print("Cannot start web server: WiFi not connected")
             return False
-            
+        
+        self.is_running = True
+        asyncio.create_task(self._open())
+        return True
+    
+    async def _open(self):
+        """Open the listening socket"""
         try:
-            # Create socket
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            
-            # Bind to address and port
-            self.server_socket.bind(('', 80))
-            
-            # Listen for connections
-            self.server_socket.listen(5)
-            self.server_socket.settimeout(0.5)  # Non-blocking with timeout
-            
-            self.is_running = True
-            print(f"Web server started at http://{self.wifi.get_ip()}")
-            return True
-            
+            self.server = await asyncio.start_server(
+                self._handle_client, '0.0.0.0', self.port, backlog=self.BACKLOG)
+            if self.wifi is not None:
+                print(f"Web server started at http://{self.wifi.get_ip()}")
+            else:
+                print(f"Web server started on port {self.port}")
         except Exception as e:
             print(f"Error starting server: {e}")
-            if self.server_socket:
-                self.server_socket.close()
+            self.server = None
             self.is_running = False
-            return False
+    
+    async def serve(self):
+        """Start the server and wait until it is stopped (standalone/host use)"""
+        if not self.start():
+            return
+        while self.is_running:
+            await asyncio.sleep(0.5)
             
     def stop(self):
-        """Stop the web server"""
-        if self.server_socket:
-            self.server_socket.close()
-            self.server_socket = None
+        """Stop the web server and close open connections"""
+        if self.server:
+            self.server.close()
+            self.server = None
+        for writer in self.clients:
+            writer.close()
         self.is_running = False
         print("Web server stopped")
         
-    def update(self):
-        """Check for client connections and handle requests"""
-        if not self.is_running or not self.server_socket:
-            return
-            
-        # Accept connections with timeout
-        try:
-            client, addr = self.server_socket.accept()
-            print(f"Client connected from: {addr}")
-            self._handle_client(client)
-        except OSError as e:
-            # Timeout or other socket error, just continue
-            pass
-            
-        # Free memory
-        gc.collect()
-        
-    def _load_html_template(self):
-        """Load HTML template from index.html file"""
-        try:
-            with open('/src/web/index.html', 'r') as f:
-                print("Successfully loaded index.html")
-                return f.read()
-        except OSError as e:
-            print(f"Error loading index.html: {e}")
-            return "<html><body><h1>Error loading template</h1><p>Could not load index.html</p></body></html>"
-    
-    def _handle_client(self, client):
-        """Handle an HTTP client connection"""
+    def _load_assets(self):
+        """Read the static web files into RAM once, with their headers pre-encoded"""
+        assets = AssetCache(self.web_root)
+        if assets.add_file('/index.html', 'index.html', 'text/html'):
+            print("Successfully loaded index.html")
+        else:
+            assets.add_bytes('/index.html',
+                             b"<html><body><h1>Error loading template</h1><p>Could not load index.html</p></body></html>",
+                             'text/html')
+        assets.add_file('/style.css', 'style.css', 'text/css')
+        return assets
+    
+    def _build_routes(self):
+        """Map b'METHOD /path' to the handler coroutine (writer, request, keep_alive)"""
+        routes = {
+            # Current data as JSON, and as a Server-Sent Events stream
+            b'GET /api/data': self._send_data_response,
+            b'GET /api/stream': self._send_event_stream,
+            # Temperature history as chunked JSON or packed binary
+            b'GET /api/history': self._send_history,
+            # Counters and latency histograms in Prometheus text format
+            b'GET /api/metrics': self._send_metrics,
+            b'POST /api/target': self._handle_target_update,
+        }
+        # Static files (index.html, style.css) from the asset cache
+        for path, asset in self.assets.assets.items():
+            routes[b'GET ' + path.encode()] = self._asset_handler(asset)
+        routes[b'GET /'] = routes[b'GET /index.html']
+        return routes
+    
+    def _asset_handler(self, asset):
+        """Create the route handler of a cached static file"""
+        async def handler(writer, request, keep_alive):
+            await self._send_asset(writer, asset, request, keep_alive)
+        return handler
+    
+    async def _handle_client(self, reader, writer):
+        """Serve requests on one connection until it closes or idles out"""
+        self.clients.append(writer)
+        CONNECTIONS.inc()
+        CONNECTIONS_TOTAL.inc()
+        request = RequestParser(self.MAX_HEADER_BYTES, self.MAX_BODY_BYTES)
         try:
-            client.settimeout(3.0)  # Set timeout for client socket operations
-            
-            # Receive data
-            request = client.recv(1024).decode()
-            
-            # Process the request
-            if request.find('GET / ') >= 0 or request.find('GET /index.html') >= 0:
-                # Main page request
-                self._send_html_response(client)
-            elif request.find('GET /style.css') >= 0:
-                # CSS file request
-                self._send_css_response(client)
-            elif request.find('GET /api/data') >= 0:
-                # API request for current data
-                self._send_data_response(client)
-            elif request.find('POST /api/target') >= 0:
-                # API request to update target temperature
-                self._handle_target_update(client, request)
-            else:
-                # Unknown request, send 404
-                self._send_404_response(client)
+            keep_alive = True
+            while keep_alive and self.is_running:
+                waited = time.ticks_ms()
+                try:
+                    if not await request.read(reader, self.IDLE_TIMEOUT, self.REQUEST_TIMEOUT):
+                        break
+                except ValueError as e:
+                    print(f"Bad request: {e}")
+                    await self._send_response(writer, "400 Bad Request", keep_alive=False)
+                    break
+                
+                start = time.ticks_us()
+                REQUEST_WAIT_MS.observe(time.ticks_diff(time.ticks_ms(), waited))
+                REQUESTS.inc()
                 
+                keep_alive = request.keep_alive()
+                handler = self.routes.get(request.route_key())
+                if handler is None:
+                    await self._send_404_response(writer, keep_alive)
+                else:
+                    await handler(writer, request, keep_alive)
+                REQUEST_US.observe(time.ticks_diff(time.ticks_us(), start))
+                
+                # Free memory
+                gc.collect()
+        except asyncio.TimeoutError:
+            # Idle keep-alive connection or stalled client
+            pass
+        except OSError:
+            # Client went away (e.g. closed an event stream)
+            pass
         except Exception as e:
             print(f"Error handling client: {e}")
         finally:
-            client.close()
+            self.clients.remove(writer)
+            CONNECTIONS.dec()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
     
-    def _send_html_response(self, client):
-        """Send the main HTML page"""
-        response = "HTTP/1.1 200 OK\r\n"
-        response += "Content-Type: text/html\r\n\r\n"
-        response += self._html
-        client.send(response.encode())
+    def _head(self, status, content_type, length, keep_alive, headers=None):
+        """Encode a status line and headers with Content-Length and connection header"""
+        if status[0] in '45':
+            ERROR_RESPONSES.inc()
+        response = f"HTTP/1.1 {status}\r\n"
+        if content_type:
+            response += f"Content-Type: {content_type}\r\n"
+        response += f"Content-Length: {length}\r\n"
+        response += "Connection: keep-alive\r\n" if keep_alive else "Connection: close\r\n"
+        if headers:
+            for header in headers:
+                response += header + "\r\n"
+        response += "\r\n"
+        return response.encode()
+    
+    async def _send_response(self, writer, status, content_type=None, body=b'',
+                             keep_alive=True, headers=None):
+        """Write a complete response with Content-Length and connection header"""
+        writer.write(self._head(status, content_type, len(body), keep_alive, headers))
+        if body:
+            writer.write(body)
+        await self._drain(writer)
+    
+    async def _drain(self, writer):
+        """Wait until the client takes the buffered output
+        Raises:
+            asyncio.TimeoutError: The client stopped reading for REQUEST_TIMEOUT
+        """
+        await asyncio.wait_for(writer.drain(), self.REQUEST_TIMEOUT)
+    
+    async def send_file(self, writer, path, content_type, keep_alive=True, head=None):
+        """Stream a file from flash through the shared buffer
+
+        The file is never held in RAM: each chunk is read into the same
+        preallocated buffer and handed to the writer (which copies it), so
+        the response needs CHUNK_BYTES of memory whatever the file size.
+        The buffer is only held for the read and the write, not while the
+        client takes the data, so a slow client delays no one else.
+
+        Args:
+            path (str): File to send
+            content_type (str): MIME type (unused when head is given)
+            head (bytes): Pre-encoded status line and headers (default: 200
+                with the file size from os.stat as Content-Length)
+        Raises:
+            OSError: The file cannot be read (nothing has been sent)
+            asyncio.TimeoutError: The client stopped reading (see _drain)
+        """
+        if head is None:
+            head = self._head("200 OK", content_type, os.stat(path)[6], keep_alive)
+        with open(path, 'rb') as f:
+            writer.write(head)
+            while True:
+                async with self._chunk_lock:
+                    count = f.readinto(self._chunk)
+                    if count:
+                        writer.write(memoryview(self._chunk)[:count])
+                if not count:
+                    break
+                await self._drain(writer)
+        await self._drain(writer)
+    
+    async def _send_asset(self, writer, asset, request, keep_alive):
+        """Send a static file (gzip-compressed if the client accepts it), or 304 if the client's copy is current"""
+        if asset.gzipped is not None and request.header_accepts(ACCEPT_ENCODING, b'gzip'):
+            asset = asset.gzipped
+        if_none_match = request.header(IF_NONE_MATCH)
+        if if_none_match is not None and asset.matches(str(if_none_match, 'utf-8')):
+            writer.write(asset.not_modified_keep_alive if keep_alive else asset.not_modified_close)
+            await self._drain(writer)
+            return
         
-    def _send_css_response(self, client):
-        """Send the CSS file"""
-        try:
-            with open('/src/web/style.css', 'r') as f:
-                css_content = f.read()
-                
-            response = "HTTP/1.1 200 OK\r\n"
-            response += "Content-Type: text/css\r\n\r\n"
-            response += css_content
-            client.send(response.encode())
-        except OSError as e:
-            print(f"Error loading style.css: {e}")
-            response = "HTTP/1.1 404 Not Found\r\n\r\n"
-            client.send(response.encode())
-        
-    def _send_data_response(self, client):
-        """Send current data as JSON"""
-        # Get current data
-        current_temp = self.temp_monitor.get_current_temp()
-        target_temp = self.temp_monitor.get_target_temp()
-        is_cooling = current_temp > target_temp
+        head = asset.head_keep_alive if keep_alive else asset.head_close
+        if asset.body is None:
+            await self.send_file(writer, asset.path, asset.content_type, keep_alive, head)
+            return
+        writer.write(head)
+        writer.write(asset.body)
+        await self._drain(writer)
+        
+    def _data_json(self):
+        """Build the current data as a JSON string"""
+        # One consistent copy, so temperature and target always match
+        state = self.temp_monitor.snapshot(self._state)
         
         # Create JSON response
         data = {
-            "temperature": round(current_temp, 1),
-            "target_temperature": round(target_temp, 1),
-            "state": "cooling" if is_cooling else "heating"
+            "temperature": round(state.current_temp, 1),
+            "target_temperature": round(state.target_temp, 1),
+            "state": "cooling" if state.output > 0 else "heating"
         }
         
-        json_data = json.dumps(data)
+        return json.dumps(data)
+    
+    async def _send_data_response(self, writer, request, keep_alive):
+        """Send current data as JSON"""
+        await self._send_response(writer, "200 OK", "application/json",
+                                  self._data_json().encode(), keep_alive,
+                                  ["Access-Control-Allow-Origin: *"])
+    
+    async def _send_event_stream(self, writer, request, keep_alive):
+        """Push current data as Server-Sent Events until the client goes away
+
+        An event is sent whenever the monitor records a reading or the target
+        changes; a heartbeat comment keeps idle connections open.
+        """
+        writer.write(b"HTTP/1.1 200 OK\r\n"
+                     b"Content-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\n"
+                     b"Connection: keep-alive\r\n"
+                     b"Access-Control-Allow-Origin: *\r\n\r\n"
+                     b"retry: 3000\n\n")
+        await self._drain(writer)
         
-        # Send response
-        response = "HTTP/1.1 200 OK\r\n"
-        response += "Content-Type: application/json\r\n"
-        response += "Access-Control-Allow-Origin: *\r\n\r\n"
-        response += json_data
-        client.send(response.encode())
+        last_count = None
+        idle_ms = 0
+        while self.is_running:
+            count = self.temp_monitor.get_update_count()
+            if count != last_count:
+                last_count = count
+                idle_ms = 0
+                writer.write(b"data: " + self._data_json().encode() + b"\n\n")
+                await self._drain(writer)
+            elif idle_ms >= self.STREAM_HEARTBEAT_MS:
+                idle_ms = 0
+                writer.write(b": heartbeat\n\n")
+                await self._drain(writer)
+            
+            await asyncio.sleep(self.STREAM_POLL_MS / 1000)
+            idle_ms += self.STREAM_POLL_MS
         
-    def _handle_target_update(self, client, request):
-        """Handle target temperature update request"""
+    def _parse_query(self, query):
+        """Split a query string into a dict (values are not URL-decoded)"""
+        params = {}
+        for pair in query.split('&'):
+            name, _, value = pair.partition('=')
+            if name:
+                params[name] = value
+        return params
+    
+    async def _send_history(self, writer, request, keep_alive):
+        """Stream /api/history?from=&to=&res=&format= from the monitor's history
+
+        Rows go out with chunked transfer encoding, one reused buffer at a
+        time, so the response is never built in full. JSON rows are
+        [time, min, avg, max, duty] in centi-degrees and percent.
+        format=bin sends a '<lHH' header (first row time, resolution, fields)
+        followed by '<l4h' rows (steps of res since the previous row, min, avg,
+        max, duty).
+        """
+        history = self.temp_monitor.history
+        params = self._parse_query(request.query())
         try:
-            # Extract the new target temperature value
-            import re
-            match = re.search(r'target=([0-9.]+)', request)
-            if match:
-                new_target = float(match.group(1))
+            end = int(params['to']) if 'to' in params else int(time.time()) + 1
+            start = int(params['from']) if 'from' in params else end - self.HISTORY_DEFAULT_SPAN
+            if params.get('res'):
+                resolution = int(params['res'])
+                history.tier_for(resolution)
+            else:
+                resolution = history.best_resolution(start)
+        except (ValueError, KeyError):
+            await self._send_response(writer, "400 Bad Request", keep_alive=keep_alive)
+            return
+        binary = params.get('format') == 'bin'
+        
+        response = "HTTP/1.1 200 OK\r\n"
+        response += "Content-Type: application/octet-stream\r\n" if binary else "Content-Type: application/json\r\n"
+        response += "Transfer-Encoding: chunked\r\n"
+        response += "Access-Control-Allow-Origin: *\r\n"
+        response += "Connection: keep-alive\r\n\r\n" if keep_alive else "Connection: close\r\n\r\n"
+        writer.write(response.encode())
+        
+        await self._stream_history_rows(writer, history, start, end, resolution, binary)
+        writer.write(b"0\r\n\r\n")
+        await self._drain(writer)
+    
+    async def _stream_history_rows(self, writer, history, start, end, resolution, binary):
+        """Encode history rows into the shared buffer and send it chunk by chunk
+
+        The buffer is held while one chunk is filled and handed to the
+        writer (which copies it); the drain runs without it, so a slow
+        client does not hold up other responses.
+        """
+        rows = history.rows(start, end, resolution)
+        row = next(rows, None)
+        previous = None
+        started = False
+        done = False
+        while not done:
+            async with self._chunk_lock:
+                chunk = self._chunk
+                size = len(chunk)
+                used = 0
+                if not started:
+                    started = True
+                    if binary:
+                        # First row time (or start when there are no rows)
+                        previous = row[0] if row is not None else start
+                        struct.pack_into('<lHH', chunk, 0, previous, resolution, 5)
+                        used = 8
+                    else:
+                        prefix = f'{{"from":{start},"to":{end},"res":{resolution},"rows":['.encode()
+                        chunk[:len(prefix)] = prefix
+                        used = len(prefix)
                 
-                # Update the target temperature
-                self.temp_monitor.set_target_temp(new_target)
+                while row is not None:
+                    if binary:
+                        if used + 12 > size:
+                            break
+                        # 32-bit step count: gaps in the history can exceed an int16
+                        struct.pack_into('<l4h', chunk, used, (row[0] - previous) // resolution,
+                                         row[1], row[2], row[3], row[4])
+                        used += 12
+                    else:
+                        encoded = f'{"," if previous is not None else ""}[{row[0]},{row[1]},{row[2]},{row[3]},{row[4]}]'.encode()
+                        if used + len(encoded) > size:
+                            break
+                        chunk[used:used + len(encoded)] = encoded
+                        used += len(encoded)
+                    previous = row[0]
+                    row = next(rows, None)
                 
-                # Send success response
-                response = "HTTP/1.1 200 OK\r\n"
-                response += "Content-Type: application/json\r\n\r\n"
-                response += json.dumps({"success": True, "target": new_target})
-                client.send(response.encode())
-            else:
-                # Bad request
-                response = "HTTP/1.1 400 Bad Request\r\n\r\n"
-                client.send(response.encode())
+                if row is None:
+                    if binary:
+                        done = True
+                    elif used + 2 <= size:
+                        chunk[used:used + 2] = b']}'
+                        used += 2
+                        done = True
+                    # else the trailer goes out in the next chunk
+                self._write_chunk(writer, used)
+            await self._drain(writer)
+    
+    def _write_chunk(self, writer, length):
+        """Hand the first length bytes of the shared buffer to the writer as one HTTP chunk"""
+        writer.write(f"{length:x}\r\n".encode())
+        writer.write(memoryview(self._chunk)[:length])
+        writer.write(b"\r\n")
+    
+    async def _send_metrics(self, writer, request, keep_alive):
+        """Send the instrumentation metrics in Prometheus text format"""
+        await self._send_response(writer, "200 OK", "text/plain; version=0.0.4",
+                                  instrumentation.render_prometheus().encode(), keep_alive)
+    
+    async def _handle_target_update(self, writer, request, keep_alive):
+        """Handle target temperature update request (form body target=<number>)"""
+        new_target = None
+        for pair in bytes(request.body()).split(b'&'):
+            name, _, value = pair.partition(b'=')
+            if name == b'target' and value:
+                new_target = self._parse_number(value)
+        
+        if new_target is None:
+            # Bad request
+            await self._send_response(writer, "400 Bad Request", keep_alive=keep_alive)
+            return
+        
+        try:
+            # Update the target temperature
+            self.temp_monitor.set_target_temp(new_target)
         except Exception as e:
             print(f"Error updating target: {e}")
-            response = "HTTP/1.1 500 Internal Server Error\r\n\r\n"
-            client.send(response.encode())
+            await self._send_response(writer, "500 Internal Server Error", keep_alive=False)
+            return
+        
+        # Send success response
+        json_data = json.dumps({"success": True, "target": new_target})
+        await self._send_response(writer, "200 OK", "application/json",
+                                  json_data.encode(), keep_alive)
+    
+    def _parse_number(self, value):
+        """Parse a decimal number such as -18.5 (None if it is not one)"""
+        for char in value:
+            if char not in b'-.0123456789':
+                return None
+        try:
+            return float(value.decode())
+        except ValueError:
+            return None
             
-    def _send_404_response(self, client):
+    async def _send_404_response(self, writer, keep_alive):
         """Send a 404 Not Found response"""
-        response = "HTTP/1.1 404 Not Found\r\n\r\n"
-        response += "<html><body><h1>404 Not Found</h1></body></html>"
-        client.send(response.encode())
+        await self._send_response(writer, "404 Not Found", "text/html",
+                                  b"<html><body><h1>404 Not Found</h1></body></html>",
+                                  keep_alive)